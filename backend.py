@@ -1,4 +1,23 @@
-from random import randint, shuffle, sample
+from collections import deque
+from functools import lru_cache
+from random import Random
+
+import dlx
+from rating import Rating, rate
+from symmetry import Transform
+from units import layout
+
+# Symboles des chiffres 1 à 25 dans les grilles écrites sur une ligne (load_string, to_string)
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+SOLVE_METHODS = ("random", "mrv", "dlx")
+
+# Nombre maximal de coups gardés pour l'annulation : au-delà, les plus anciens sont oubliés
+HISTORY_LIMIT = 4096
+
+# Nombre maximal d'hypothèses pour prouver l'unicité après chaque case vidée d'une grille plus grande que 9x9
+# (voir dig_unique) : sans limite, quelques preuves sur une grille 16x16 prennent plusieurs secondes
+DIG_BUDGET = 10
 
 # Classe représentant une case de la grille
 class Box:
@@ -23,77 +42,539 @@ class Box:
         """
         return str(self.value) if self.value != 0 else '.'
 
+# Vue sur une case d'une grille compacte, pour garder l'interface des objets Box
+class BoxView(Box):
+    def __init__(self, owner: "Grid", index: int, initial: bool = False):
+        """
+        Initialise une vue sur la case d'indice index (row * size + col) d'une grille.
+        La vue ne stocke aucune valeur : elle lit et écrit directement dans la grille.
+        
+        Args:
+            owner (Grid): La grille contenant la case.
+            index (int): Indice de la case dans la grille.
+            initial (bool): Indique si la vue porte sur la grille initiale.
+        """
+        self.owner = owner
+        self.index = index
+        self.initial = initial
+
+    @property
+    def value(self) -> int:
+        """
+        Returns:
+            int: La valeur de la case (0 pour une case vide).
+        """
+        values = self.owner.initial_values if self.initial else self.owner.values
+        return values[self.index]
+
+    @value.setter
+    def value(self, value: int) -> None:
+        row, col = divmod(self.index, self.owner.size)
+        if self.initial:
+            self.owner.set_initial_value(col, row, value)
+        else:
+            self.owner.set_value(col, row, value)
+            self.owner.invalidate_candidates()
+
+    @property
+    def locked(self) -> bool:
+        """
+        Returns:
+            bool: True si la case est verrouillée, sinon False.
+        """
+        return bool(self.owner.locked >> self.index & 1)
+
+    @locked.setter
+    def locked(self, locked: bool) -> None:
+        if locked:
+            self.owner.locked |= 1 << self.index
+        else:
+            self.owner.locked &= ~(1 << self.index)
+
+# Classe maintenant les chiffres déjà utilisés sous forme de masques de bits
+class Constraints:
+    def __init__(self, box: int = 3):
+        """
+        Initialise des masques vides pour les lignes, les colonnes et les blocs d'une grille.
+        Le bit (n - 1) d'un masque est à 1 si le chiffre n est déjà présent dans l'unité.
+        Le nombre d'occurrences de chaque chiffre dans chaque unité est aussi compté, pour que
+        retirer un chiffre en double ne le retire pas du masque et pour connaître les doublons.
+
+        Args:
+            box (int): Côté d'un bloc (3 pour une grille 9x9).
+        """
+        self.box = box
+        self.size = box * box
+        self.full = (1 << self.size) - 1
+        self.rows = [0] * self.size
+        self.cols = [0] * self.size
+        self.boxes = [0] * self.size
+        # counts[unit * size + number - 1] : occurrences du chiffre dans l'unité, numérotée comme
+        # units.Layout.units (lignes, puis colonnes, puis blocs)
+        self.counts = bytearray(3 * self.size * self.size)
+        self.duplicates = set()  # Indices de counts supérieurs à 1
+
+    def reset(self, values: bytearray) -> None:
+        """
+        Recalcule tous les masques à partir des valeurs d'une grille.
+
+        Args:
+            values (bytearray): Les valeurs de la grille, ligne par ligne.
+        """
+        size = self.size
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        self.counts = bytearray(3 * size * size)
+        self.duplicates = set()
+        for index, value in enumerate(values):
+            if value:
+                self.place(index // size, index % size, value)
+
+    def copy(self) -> "Constraints":
+        """
+        Returns:
+            Constraints: Une copie indépendante des masques.
+        """
+        constraints = Constraints(self.box)
+        constraints.rows = self.rows[:]
+        constraints.cols = self.cols[:]
+        constraints.boxes = self.boxes[:]
+        constraints.counts = self.counts[:]
+        constraints.duplicates = set(self.duplicates)
+        return constraints
+
+    def place(self, row: int, col: int, number: int) -> None:
+        """
+        Enregistre le placement d'un chiffre dans une case.
+
+        Args:
+            row (int): Ligne de la case.
+            col (int): Colonne de la case.
+            number (int): Chiffre placé (1 à size).
+        """
+        box, size = self.box, self.size
+        block = box * (row // box) + col // box
+        bit = 1 << (number - 1)
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[block] |= bit
+
+        counts = self.counts
+        for key in (row * size + number - 1, (size + col) * size + number - 1, (2 * size + block) * size + number - 1):
+            counts[key] += 1
+            if counts[key] == 2:
+                self.duplicates.add(key)
+
+    def remove(self, row: int, col: int, number: int) -> None:
+        """
+        Annule le placement d'un chiffre dans une case.
+
+        Args:
+            row (int): Ligne de la case.
+            col (int): Colonne de la case.
+            number (int): Chiffre retiré (1 à size).
+        """
+        box, size = self.box, self.size
+        block = box * (row // box) + col // box
+        mask = ~(1 << (number - 1))
+        counts = self.counts
+
+        # Le chiffre ne quitte le masque d'une unité que s'il n'y reste plus
+        key = row * size + number - 1
+        counts[key] -= 1
+        if counts[key] == 0:
+            self.rows[row] &= mask
+        elif counts[key] == 1:
+            self.duplicates.discard(key)
+        key = (size + col) * size + number - 1
+        counts[key] -= 1
+        if counts[key] == 0:
+            self.cols[col] &= mask
+        elif counts[key] == 1:
+            self.duplicates.discard(key)
+        key = (2 * size + block) * size + number - 1
+        counts[key] -= 1
+        if counts[key] == 0:
+            self.boxes[block] &= mask
+        elif counts[key] == 1:
+            self.duplicates.discard(key)
+
+    def candidates(self, row: int, col: int) -> int:
+        """
+        Calcule les chiffres encore autorisés pour une case.
+
+        Args:
+            row (int): Ligne de la case.
+            col (int): Colonne de la case.
+
+        Returns:
+            int: Masque de bits des chiffres autorisés.
+        """
+        box = self.box
+        return ~(self.rows[row] | self.cols[col] | self.boxes[box * (row // box) + col // box]) & self.full
+
+    def can_place(self, row: int, col: int, number: int) -> bool:
+        """
+        Vérifie en temps constant si un chiffre est absent de la ligne, de la colonne et du bloc.
+
+        Args:
+            row (int): Ligne de la case.
+            col (int): Colonne de la case.
+            number (int): Chiffre à tester (1 à size).
+
+        Returns:
+            bool: True si le chiffre peut être placé, sinon False.
+        """
+        box = self.box
+        return not (self.rows[row] | self.cols[col] | self.boxes[box * (row // box) + col // box]) & (1 << (number - 1))
+
 # Classe représentant une grille de Sudoku
 class Grid:
-    def __init__(self):
+    def __init__(self, rng: Random = None, box: int = 3):
         """
-        Initialise une grille 9x9 vide (toutes les cases à 0).
+        Initialise une grille vide (toutes les cases à 0) de côté size = box * box : 9x9 par défaut,
+        4x4, 16x16 ou 25x25 avec des blocs de côté 2, 4 ou 5.
+        Les size * size valeurs sont stockées ligne par ligne dans un bytearray, et le verrouillage
+        des cases dans un entier (bit row * size + col à 1 si la case est verrouillée).
+        
+        Args:
+            rng (Random): Générateur aléatoire utilisé par generate et solve (un générateur
+                indépendant non initialisé par défaut).
+            box (int): Côté d'un bloc.
+        """
+        self.layout = layout(box)
+        self.box = box
+        self.size = self.layout.size
+        self.cells = self.layout.cells
+        self.rng = rng if rng is not None else Random()
+        self.seed = None
+        self.values = bytearray(self.cells)
+        self.initial_values = bytearray(self.cells)
+        self.solution = bytearray(self.cells)
+        self.locked = 0
+        self.constraints = Constraints(box)
+        self.initial_constraints = Constraints(box)
+        self._views = None
+        self._initial_views = None
+        self._candidates = None
+        self._initial_candidates = None
+        self.listeners = []
+        # Coups joués par set_element, chacun codé sur un entier (voir record) : les annulés
+        # sont rejouables par redo jusqu'au prochain coup
+        self.history = deque(maxlen=HISTORY_LIMIT)
+        self.redo_history = []
+        self.branches = 0  # Nombre de valeurs essayées sur une case à plusieurs candidats par solve_mrv
+        self.rating = None
+
+    def add_listener(self, listener) -> None:
+        """
+        Abonne une fonction aux modifications de la grille faites par set_element, undo, redo, restart,
+        generate, load et restore.
+        Elle reçoit la liste des cases (col, row) modifiées, ou None si toute la grille a changé.
+        Les méthodes de résolution, qui modifient la grille en masse, ne préviennent pas les abonnés.
+        
+        Args:
+            listener: La fonction à appeler.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """
+        Désabonne une fonction ajoutée avec add_listener.
+        
+        Args:
+            listener: La fonction à retirer.
+        """
+        self.listeners.remove(listener)
+
+    def notify(self, cells: list[tuple[int, int]] | None) -> None:
+        """
+        Prévient les abonnés d'une modification.
+        
+        Args:
+            cells (list[tuple[int, int]] | None): Les cases (col, row) modifiées, ou None pour toute la grille.
+        """
+        for listener in self.listeners:
+            listener(cells)
+
+    @property
+    def grid(self) -> list[list[Box]]:
+        """
+        Returns:
+            list[list[Box]]: La grille courante sous forme de vues size x size, créées au premier accès.
+        """
+        if self._views is None:
+            size = self.size
+            self._views = [[BoxView(self, row * size + col) for col in range(size)] for row in range(size)]
+        return self._views
+
+    @property
+    def initial_grid(self) -> list[list[Box]]:
+        """
+        Returns:
+            list[list[Box]]: La grille initiale sous forme de vues size x size, créées au premier accès.
+        """
+        if self._initial_views is None:
+            size = self.size
+            self._initial_views = [
+                [BoxView(self, row * size + col, initial=True) for col in range(size)] for row in range(size)
+            ]
+        return self._initial_views
+
+    def copy(self) -> "Grid":
+        """
+        Returns:
+            Grid: Une copie indépendante de la grille, sans recopier de cases une à une.
+        """
+        grid = Grid(box=self.box)
+        grid.values[:] = self.values
+        grid.initial_values[:] = self.initial_values
+        grid.solution[:] = self.solution
+        grid.locked = self.locked
+        grid.seed = self.seed
+        grid.constraints = self.constraints.copy()
+        grid.initial_constraints = self.initial_constraints.copy()
+        return grid
+
+    def load(self, values) -> None:
+        """
+        Charge une grille à partir de size * size valeurs données ligne par ligne (0 pour une case vide).
+        Les cases remplies sont verrouillées et forment la grille initiale.
+        
+        Args:
+            values: Les valeurs (bytes, bytearray ou séquence d'entiers).
+        
+        Raises:
+            ValueError: Si le nombre de valeurs ne correspond pas à la taille de la grille, ou si une
+                valeur dépasse size.
         """
-        self.grid = [[Box(0) for _ in range(9)] for _ in range(9)]
-        self.initial_grid = [[Box(0) for _ in range(9)] for _ in range(9)]
+        values = bytes(values)
+        if len(values) != self.cells:
+            raise ValueError(f"Une grille {self.size}x{self.size} a {self.cells} cases, pas {len(values)}")
+        # Une valeur trop grande écrirait dans les compteurs d'une autre unité (voir Constraints)
+        if max(values) > self.size:
+            raise ValueError(f"Valeur invalide pour une grille {self.size}x{self.size} : {max(values)}")
+        self.values[:] = values
+        self.initial_values[:] = self.values
+        self.solution[:] = bytes(self.cells)
+        self.locked = 0
+        for index, value in enumerate(self.values):
+            if value:
+                self.locked |= 1 << index
+        self.constraints.reset(self.values)
+        self.initial_constraints.reset(self.initial_values)
+        self.invalidate_candidates()
+        self.clear_history()
+        self.notify(None)
+
+    def load_string(self, puzzle: str) -> None:
+        """
+        Charge une grille écrite sur size * size caractères, ligne par ligne, avec '.' ou '0' pour
+        une case vide et les symboles de SYMBOLS pour les chiffres (A pour 10, B pour 11...).
+        
+        Args:
+            puzzle (str): La grille sur size * size caractères.
+        
+        Raises:
+            ValueError: Si la chaîne ne décrit pas une grille de size * size cases.
+        """
+        puzzle = puzzle.strip().upper()
+        symbols = ".0" + SYMBOLS[:self.size]
+        if len(puzzle) != self.cells or any(char not in symbols for char in puzzle):
+            raise ValueError(f"Grille invalide : {puzzle!r}")
+        self.load(max(symbols.index(char) - 1, 0) for char in puzzle)
+
+    def snapshot(self) -> bytes:
+        """
+        Représentation compacte et hachable de l'état de la grille : les valeurs courantes suivies
+        des octets du masque de verrouillage (81 + 11 = 92 octets pour une grille 9x9).
+        
+        Returns:
+            bytes: L'instantané de la grille.
+        """
+        return bytes(self.values) + self.locked.to_bytes((self.cells + 7) // 8, "little")
+
+    def restore(self, snapshot: bytes) -> None:
+        """
+        Restaure un état produit par snapshot. La grille initiale est reconstruite à partir
+        des cases verrouillées.
+        
+        Args:
+            snapshot (bytes): L'instantané à restaurer.
+        """
+        cells = self.cells
+        self.values[:] = snapshot[:cells]
+        self.locked = int.from_bytes(snapshot[cells:cells + (cells + 7) // 8], "little")
+        for index in range(cells):
+            self.initial_values[index] = self.values[index] if self.locked >> index & 1 else 0
+        self.constraints.reset(self.values)
+        self.initial_constraints.reset(self.initial_values)
+        self.invalidate_candidates()
+        self.clear_history()
+        self.notify(None)
     
     def __str__(self) -> str:
         """
         Représentation lisible de la grille sous forme de chaîne de caractères.
-        Inclut des séparateurs pour diviser la grille en blocs 3x3.
+        Inclut des séparateurs pour diviser la grille en blocs (3x3 pour une grille 9x9).
         
         Returns:
             str: La représentation de la grille.
         """
         string = ""
-        horizontal_separator = "+-------+-------+-------+\n"
+        box, size = self.box, self.size
+        horizontal_separator = ("+" + "-" * (2 * box + 1)) * box + "+\n"
         
-        for i, row in enumerate(self.grid):
-            if i % 3 == 0:
+        for i in range(size):
+            if i % box == 0:
                 string += horizontal_separator
-            for j, box in enumerate(row):
-                if j % 3 == 0:
+            for j, value in enumerate(self.values[i * size:(i + 1) * size]):
+                if j % box == 0:
                     string += "| "
-                string += ". " if box.value == 0 else str(box.value) + " "
+                string += ". " if value == 0 else SYMBOLS[value - 1] + " "
             string += "|\n"
         string += horizontal_separator
         return string
+
+    def to_string(self, values: bytearray = None) -> str:
+        """
+        Représentation sur une seule ligne de size * size caractères, ligne par ligne, avec '.' pour
+        une case vide (voir load_string).
+        
+        Args:
+            values (bytearray): Les valeurs à représenter (par défaut la grille courante).
+        
+        Returns:
+            str: La grille sur size * size caractères.
+        """
+        if values is None:
+            values = self.values
+        return "".join(SYMBOLS[value - 1] if value else "." for value in values)
     
-    def generate(self, level: int) -> None:
+    def generate(self, level: int, unique: bool = False, seed: int = None,
+                 band: tuple[int, int | None] = None, attempts: int = 50) -> None:
         """
         Génère une grille de Sudoku partiellement remplie selon le niveau de difficulté.
         
         Args:
             level (int): Nombre de cases à vider après la génération de la solution.
+            unique (bool): Si True, une case n'est vidée que si la grille garde une solution unique.
+                level devient alors un maximum : on s'arrête quand plus aucune case ne peut être vidée.
+            seed (int): Si donnée, le générateur aléatoire est réinitialisé avec cette graine :
+                la grille ne dépend alors que de (seed, level, unique, band).
+            band (tuple[int, int | None]): Fourchette (note minimale, note maximale ou None) visée
+                (voir rating.rate). Les grilles hors de la fourchette sont écartées sans être notées
+                entièrement, et la solution unique est alors imposée.
+            attempts (int): Nombre maximal de grilles essayées pour atteindre la fourchette ; la dernière
+                est gardée si aucune ne convient.
+        
+        Raises:
+            ValueError: Si une fourchette est donnée pour une grille autre que 9x9 (la notation ne
+                connaît que les grilles 9x9).
         """
-        # Réinitialisation de la grille à vide
-        self.grid = [[Box(0) for _ in range(9)] for _ in range(9)]
-
-        # Remplissage de quelques cases initiales avec des valeurs valides
-        for _ in range(10):
-            row, col = randint(0, 8), randint(0, 8)
-            
-            while self.grid[row][col].value != 0:
-                row, col = randint(0, 8), randint(0, 8)
-                
-            liste_elements = list(range(1, 10))
-            shuffle(liste_elements)
-
-            while not self.is_valid(col, row, liste_elements[0]) and len(liste_elements) > 0:
-                liste_elements.pop(0)
-            self.grid[row][col].value = liste_elements[0]
-        
-        # Résolution de la grille
-        self.solve()
-
-        # Vidage de quelques cases en fonction du niveau de difficulté
-        for _ in range(level):
-            row, col = randint(0, 8), randint(0, 8)
-            
-            while self.grid[row][col].value == 0:
-                row, col = randint(0, 8), randint(0, 8)
-            self.grid[row][col].value = 0
-
-        # Convertir les entiers en objets Box avec statut verrouillé ou non
-        for x in range(len(self.grid)):
-            for y in range(len(self.grid[0])):
-                self.grid[x][y].locked = True if self.grid[x][y].value else False
-        self.initial_grid = [[Box(cell.value, cell.locked) for cell in row] for row in self.grid]
+        if band is not None and self.box != 3:
+            raise ValueError("Seules les grilles 9x9 peuvent être notées")
+        if seed is not None:
+            self.rng.seed(seed)
+        self.seed = seed
+        self.rating = None
+
+        for _ in range(attempts if band is not None else 1):
+            # Réinitialisation de la grille à vide
+            self.values[:] = bytes(self.cells)
+            self.locked = 0
+            self.constraints.reset(self.values)
+
+            # Remplissage complet de la grille, les chiffres étant essayés dans un ordre aléatoire
+            self.solve_mrv(randomize=True)
+            self.solution[:] = self.values
+
+            # Vidage de quelques cases en fonction du niveau de difficulté
+            if unique or band is not None:
+                # Les grilles 9x9 gardent une preuve complète : leurs graines donnent les mêmes grilles
+                self.dig_unique(level, None if self.box == 3 else DIG_BUDGET)
+            else:
+                last = self.size - 1
+                for _ in range(min(level, self.cells)):
+                    row, col = self.rng.randint(0, last), self.rng.randint(0, last)
+                    
+                    while self.values[row * self.size + col] == 0:
+                        row, col = self.rng.randint(0, last), self.rng.randint(0, last)
+                    self.set_value(col, row, 0)
+
+            if band is not None:
+                self.rating = rate(self, *band)
+                if self.rating is not None:
+                    break
+
+        # Verrouillage des cases remplies et copie de la grille initiale
+        for index, value in enumerate(self.values):
+            if value:
+                self.locked |= 1 << index
+        self.initial_values[:] = self.values
+        self.initial_constraints.reset(self.initial_values)
+        self.invalidate_candidates()
+        self.clear_history()
+        self.notify(None)
+
+    def generate_from(self, seeds: list[tuple[bytes, bytes, Rating | None]], seed: int = None) -> None:
+        """
+        Génère une grille sans recherche en appliquant une transformation tirée au hasard
+        (voir symmetry.Transform) à une grille tirée au hasard parmi seeds. La grille obtenue
+        est équivalente à celle d'origine : elle garde l'unicité de sa solution. Sa note est en revanche
+        recalculée (si la grille d'origine en a une) : les techniques et les hypothèses parcourent les cases
+        dans l'ordre des indices, si bien que le nombre de vagues et d'hypothèses dépend de la transformation.
+        
+        Args:
+            seeds (list[tuple[bytes, bytes, Rating | None]]): Grilles d'origine (voir make_seeds) :
+                valeurs données, solution et note.
+            seed (int): Si donnée, le générateur aléatoire est réinitialisé avec cette graine :
+                la grille ne dépend alors que de (seed, seeds).
+        
+        Raises:
+            ValueError: Si la grille n'est pas une grille 9x9 (les transformations ne connaissent qu'elles).
+        """
+        if self.box != 3:
+            raise ValueError("Seules les grilles 9x9 peuvent être transformées")
+        if seed is not None:
+            self.rng.seed(seed)
+        self.seed = seed
+        values, solution, rating = seeds[self.rng.randrange(len(seeds))]
+        transform = Transform.random(self.rng)
+        self.load(transform.apply(values))
+        self.solution[:] = transform.apply(solution)
+        self.rating = rate(self) if rating is not None else None
+
+    def dig_unique(self, level: int, budget: int = None) -> int:
+        """
+        Vide jusqu'à level cases, dans un ordre aléatoire, en conservant une solution unique.
+        
+        Args:
+            level (int): Nombre maximal de cases à vider.
+            budget (int): Nombre maximal d'hypothèses pour prouver l'unicité après chaque case vidée
+                (voir count_solutions) ; une case dont l'unicité n'est pas prouvée à temps est remise.
+                Aucune limite si None.
+        
+        Returns:
+            int: Nombre de cases effectivement vidées.
+        """
+        removed = 0
+        size = self.size
+        for index in self.rng.sample(range(self.cells), self.cells):
+            if removed == level:
+                break
+            row, col = divmod(index, size)
+            value = self.values[index]
+            if value == 0:
+                continue
+            self.set_value(col, row, 0)
+            self.branches = 0
+            if self.count_solutions(2, budget) == 1:
+                removed += 1
+            else:
+                self.set_value(col, row, value)
+        return removed
 
     def is_valid(self, col: int, row: int, number: int, initial: bool = False) -> bool:
         """
@@ -108,24 +589,49 @@ class Grid:
         Returns:
             bool: True si l'élément peut être placé, sinon False.
         """
-        grid = self.initial_grid if initial else self.grid
+        constraints = self.initial_constraints if initial else self.constraints
         
-        if not (0 <= col <= 8) or not (0 <= row <= 8) or not (1 <= number <= 9):
+        size = self.size
+        if not (0 <= col < size) or not (0 <= row < size) or not (1 <= number <= size):
             return False
-        if grid[row][col].locked:
+        if self.locked >> (row * size + col) & 1:
             return False
-        # Vérifie la ligne et la colonne
-        for test in range(9):
-            if number == grid[row][test].value or grid[test][col].value == number:
-                return False
+        # Vérifie la ligne, la colonne et le bloc via les masques de bits
+        return constraints.can_place(row, col, number)
 
-        # Vérifie le bloc 3x3
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(3):
-            for j in range(3):
-                if grid[start_row + i][start_col + j].value == number:
-                    return False
-        return True
+    def set_value(self, col: int, row: int, number: int) -> None:
+        """
+        Écrit une valeur dans une case sans vérification et met à jour les masques de contraintes.
+        Le cache des candidats n'est pas mis à jour (voir invalidate_candidates).
+        
+        Args:
+            col (int): Colonne de la case.
+            row (int): Ligne de la case.
+            number (int): Valeur à écrire (0 pour vider la case).
+        """
+        index = row * self.size + col
+        if self.values[index]:
+            self.constraints.remove(row, col, self.values[index])
+        if number:
+            self.constraints.place(row, col, number)
+        self.values[index] = number
+
+    def set_initial_value(self, col: int, row: int, number: int) -> None:
+        """
+        Écrit une valeur dans la grille initiale sans vérification et met à jour ses masques.
+        
+        Args:
+            col (int): Colonne de la case.
+            row (int): Ligne de la case.
+            number (int): Valeur à écrire (0 pour vider la case).
+        """
+        index = row * self.size + col
+        if self.initial_values[index]:
+            self.initial_constraints.remove(row, col, self.initial_values[index])
+        if number:
+            self.initial_constraints.place(row, col, number)
+        self.initial_values[index] = number
+        self._initial_candidates = None
 
     def find_empty_cell(self) -> tuple[int, int] | None:
         """
@@ -134,34 +640,213 @@ class Grid:
         Returns:
             tuple[int, int] | None: Un tuple (row, col) ou None si aucune cellule vide n'est trouvée.
         """
-        for row in range(9):
-            for col in range(9):
-                if self.grid[row][col].value == 0:
-                    return (row, col)
-        return None
+        index = self.values.find(0)
+        return None if index == -1 else divmod(index, self.size)
 
-    def solve(self) -> bool:
+    def solve(self, method: str = "random") -> bool:
         """
         Résout la grille en utilisant la technique de backtracking.
         
+        Args:
+            method (str): "random" parcourt les cases dans l'ordre et essaie les chiffres dans un ordre
+                aléatoire, "mrv" utilise solve_mrv, "dlx" la couverture exacte (voir dlx.py).
+        
         Returns:
             bool: True si une solution est trouvée, sinon False.
         """
+        self.invalidate_candidates()
+        if method not in SOLVE_METHODS:
+            raise ValueError(f"Méthode de résolution inconnue : {method}")
+        # Un chiffre en double dans une unité ne peut pas être corrigé en remplissant les cases vides
+        if self.constraints.duplicates:
+            return False
+        if method == "mrv":
+            return self.solve_mrv()
+        if method == "dlx":
+            solution = next(self.solutions(1), None)
+            if solution is None:
+                return False
+            for index, value in enumerate(self.values):
+                if value == 0:
+                    self.set_value(index % self.size, index // self.size, solution[index])
+            return True
+
         cell = self.find_empty_cell()
         if cell is None:
             return True
         
         row, col = cell
 
-        for number in sample(range(1, 10), 9):  # Génére les nombres de 1 à 9 dans un ordre aléatoire
-            if self.is_valid(col, row, number):
-                self.grid[row][col].value = number
+        for number in self.rng.sample(range(1, self.size + 1), self.size):  # Génére les nombres de 1 à size dans un ordre aléatoire
+            if self.constraints.can_place(row, col, number):
+                self.set_value(col, row, number)
                 if self.solve():
                     return True
                 # Retour en arrière si la solution ne fonctionne pas
-                self.grid[row][col].value = 0
+                self.set_value(col, row, 0)
+        return False
+
+    def propagate(self, trail: list[tuple[int, int]]) -> bool:
+        """
+        Remplit les singletons nus (une seule valeur possible pour la case) et les singletons cachés
+        (une seule case possible pour une valeur dans une unité) jusqu'à ce que plus rien ne change.
+        
+        Args:
+            trail (list[tuple[int, int]]): Liste complétée avec les cases (row, col) remplies, pour pouvoir les vider.
+        
+        Returns:
+            bool: False si une contradiction est détectée, sinon True.
+        """
+        values = self.values
+        size = self.size
+        full = self.constraints.full
+        candidates_of = self.constraints.candidates
+        changed = True
+        while changed:
+            changed = False
+            index = values.find(0)
+            while index != -1:
+                row, col = divmod(index, size)
+                candidates = candidates_of(row, col)
+                if candidates == 0:
+                    return False
+                if candidates & (candidates - 1) == 0:
+                    self.set_value(col, row, candidates.bit_length())
+                    trail.append((row, col))
+                    changed = True
+                index = values.find(0, index + 1)
+
+            for unit in self.layout.unit_cells:
+                # Chiffres possibles dans au moins une case, puis dans au moins deux cases de l'unité
+                once, twice, placed, filled = 0, 0, 0, 0
+                for row, col, index in unit:
+                    value = values[index]
+                    if value:
+                        placed |= 1 << (value - 1)
+                        filled += 1
+                    else:
+                        candidates = candidates_of(row, col)
+                        twice |= once & candidates
+                        once |= candidates
+                # Un chiffre sans case possible, ou présent deux fois dans l'unité
+                if (once | placed) != full or placed.bit_count() != filled:
+                    return False
+                singles = once & ~twice
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    number = bit.bit_length()
+                    for row, col, index in unit:
+                        if values[index] == 0 and candidates_of(row, col) & bit:
+                            self.set_value(col, row, number)
+                            trail.append((row, col))
+                            changed = True
+                            break
+                    else:
+                        return False
+        return True
+
+    def solve_mrv(self, randomize: bool = False) -> bool:
+        """
+        Résout la grille par propagation de contraintes puis backtracking sur la case
+        ayant le moins de valeurs possibles (heuristique MRV).
+        
+        Args:
+            randomize (bool): Si True, les valeurs possibles sont essayées dans un ordre aléatoire,
+                ce qui permet de remplir une grille vide de façon aléatoire (utilisé par generate).
+        
+        Returns:
+            bool: True si une solution est trouvée, sinon False.
+        """
+        self.invalidate_candidates()
+        size = self.size
+        trail = []
+        if self.propagate(trail):
+            best, best_count = None, size + 1
+            for row in range(size):
+                for col in range(size):
+                    if self.values[row * size + col] == 0:
+                        count = self.constraints.candidates(row, col).bit_count()
+                        if count < best_count:
+                            best, best_count = (row, col), count
+            if best is None:
+                return True
+
+            row, col = best
+            candidates = self.constraints.candidates(row, col)
+            numbers = [number for number in range(1, size + 1) if candidates >> (number - 1) & 1]
+            if randomize:
+                self.rng.shuffle(numbers)
+            for number in numbers:
+                if best_count > 1:
+                    self.branches += 1
+                self.set_value(col, row, number)
+                if self.solve_mrv(randomize):
+                    return True
+                self.set_value(col, row, 0)
+
+        # Retour en arrière : on vide les cases remplies par la propagation
+        for row, col in reversed(trail):
+            self.set_value(col, row, 0)
         return False
 
+    def solutions(self, limit: int = None):
+        """
+        Énumère les solutions de la grille par couverture exacte (voir dlx.py), sans la modifier.
+        
+        Args:
+            limit (int): Nombre maximal de solutions à énumérer (toutes si None).
+        
+        Yields:
+            bytes: Les valeurs de chaque solution.
+        """
+        return dlx.solutions(bytes(self.values), limit)
+
+    def count_solutions(self, limit: int = 2, budget: int = None) -> int:
+        """
+        Compte les solutions de la grille en s'arrêtant dès que limit solutions sont trouvées.
+        La grille est laissée dans son état d'origine.
+        
+        Args:
+            limit (int): Nombre de solutions à partir duquel la recherche s'arrête.
+            budget (int): Si donné, la recherche s'arrête quand self.branches atteint budget et renvoie
+                alors limit, comme si la grille avait trop de solutions (à remettre à 0 avant l'appel).
+        
+        Returns:
+            int: Le nombre de solutions trouvées (au plus limit).
+        """
+        count = 0
+        size = self.size
+        trail = []
+        if self.propagate(trail):
+            best, best_count = None, size + 1
+            for row in range(size):
+                for col in range(size):
+                    if self.values[row * size + col] == 0:
+                        n = self.constraints.candidates(row, col).bit_count()
+                        if n < best_count:
+                            best, best_count = (row, col), n
+            if best is None:
+                count = 1
+            else:
+                row, col = best
+                candidates = self.constraints.candidates(row, col)
+                while candidates and count < limit:
+                    if budget is not None and self.branches >= budget:
+                        count = limit
+                        break
+                    if best_count > 1:
+                        self.branches += 1
+                    bit = candidates & -candidates
+                    candidates ^= bit
+                    self.set_value(col, row, bit.bit_length())
+                    count += self.count_solutions(limit - count, budget)
+                    self.set_value(col, row, 0)
+
+        for row, col in reversed(trail):
+            self.set_value(col, row, 0)
+        return count
+
     def is_allowed(self, col: int, row: int) -> bool:
         """
         Vérifie si une case donnée peut être modifiée par l'utilisateur.
@@ -173,7 +858,7 @@ class Grid:
         Returns:
             bool: True si la case est modifiable (non verrouillée), sinon False.
         """
-        return not self.grid[row][col].locked
+        return not self.locked >> (row * self.size + col) & 1
 
     def set_element(self, col: int, row: int, element: int) -> bool:
         """
@@ -191,78 +876,233 @@ class Grid:
         if not self.is_valid(col, row, element, initial=True):
             return False
 
-        self.grid[row][col].value = element
+        index = row * self.size + col
+        self.record(index, self.values[index], element)
+        self.write(index, element)
         return True
 
+    def write(self, index: int, number: int) -> None:
+        """
+        Écrit une valeur jouée (coup, annulation ou rétablissement) : met à jour les masques,
+        le cache des candidats et prévient les abonnés.
+        
+        Args:
+            index (int): Indice de la case (row * size + col).
+            number (int): Valeur à écrire (0 pour vider la case).
+        """
+        size = self.size
+        row, col = divmod(index, size)
+        self.set_value(col, row, number)
+
+        # Mise à jour du cache des candidats pour la case et ses voisins (20 dans une grille 9x9)
+        if self._candidates is not None:
+            for cell in (index,) + self.layout.peers[index]:
+                self._candidates[cell] = 0 if self.values[cell] else self.constraints.candidates(cell // size, cell % size)
+        self.notify([(col, row)])
+
+    def record(self, index: int, old: int, new: int) -> None:
+        """
+        Ajoute un coup à l'historique sous forme d'un entier (index << 10 | old << 5 | new), ce qui
+        suffit pour l'annuler et le rejouer. Un nouveau coup rend les coups annulés irrécupérables.
+        
+        Args:
+            index (int): Indice de la case.
+            old (int): Valeur avant le coup.
+            new (int): Valeur après le coup.
+        """
+        self.history.append(index << 10 | old << 5 | new)
+        self.redo_history.clear()
+
+    def clear_history(self) -> None:
+        """
+        Oublie tous les coups joués et annulés (après le chargement d'une nouvelle grille).
+        """
+        self.history.clear()
+        self.redo_history.clear()
+
+    def undo(self) -> bool:
+        """
+        Annule le dernier coup joué, en temps constant.
+        
+        Returns:
+            bool: True si un coup a été annulé, False si l'historique est vide.
+        """
+        if not self.history:
+            return False
+        move = self.history.pop()
+        self.redo_history.append(move)
+        self.write(move >> 10, move >> 5 & 31)
+        return True
+
+    def redo(self) -> bool:
+        """
+        Rejoue le dernier coup annulé, en temps constant.
+        
+        Returns:
+            bool: True si un coup a été rejoué, False s'il n'y en a aucun.
+        """
+        if not self.redo_history:
+            return False
+        move = self.redo_history.pop()
+        self.history.append(move)
+        self.write(move >> 10, move & 31)
+        return True
+
+    def restart(self) -> None:
+        """
+        Recommence la grille : les valeurs courantes sont remplacées par celles de la grille initiale,
+        sans la régénérer, et l'historique des coups est vidé.
+        """
+        self.values[:] = self.initial_values
+        self.constraints = self.initial_constraints.copy()
+        self.invalidate_candidates()
+        self.clear_history()
+        self.notify(None)
+
+    def candidates(self, col: int, row: int, initial: bool = False) -> int:
+        """
+        Retourne en temps constant les valeurs possibles d'une case, lues dans un cache tenu à jour
+        par set_element, undo et redo et recalculé seulement après generate, load, restore, restart ou solve.
+        
+        Args:
+            col (int): Colonne de la case.
+            row (int): Ligne de la case.
+            initial (bool): Si True, les valeurs que set_element accepte (compatibles avec la grille
+                initiale), sinon celles compatibles avec la grille courante (notes du joueur).
+        
+        Returns:
+            int: Masque de bits des valeurs possibles (bit n - 1 pour la valeur n), nul pour une case
+            verrouillée ou, hors grille initiale, déjà remplie.
+        """
+        size = self.size
+        if initial:
+            if self._initial_candidates is None:
+                self._initial_candidates = [
+                    0 if self.locked >> index & 1 else self.initial_constraints.candidates(index // size, index % size)
+                    for index in range(self.cells)
+                ]
+            return self._initial_candidates[row * size + col]
+        if self._candidates is None:
+            self._candidates = [
+                0 if self.values[index] else self.constraints.candidates(index // size, index % size)
+                for index in range(self.cells)
+            ]
+        return self._candidates[row * size + col]
+
+    def conflicts(self) -> set[int]:
+        """
+        Retourne les cases en conflit : celles dont la valeur apparaît plusieurs fois dans leur ligne,
+        leur colonne ou leur bloc. Seules les unités où Constraints a compté un doublon sont parcourues.
+        
+        Returns:
+            set[int]: Indices (row * size + col) des cases en conflit, vide si la grille n'a aucun doublon.
+        """
+        size = self.size
+        values = self.values
+        conflicts = set()
+        for key in self.constraints.duplicates:
+            unit, digit = divmod(key, size)
+            conflicts.update(index for index in self.layout.units[unit] if values[index] == digit + 1)
+        return conflicts
+
+    def invalidate_candidates(self) -> None:
+        """
+        Vide le cache des candidats, qui sera recalculé à la prochaine lecture.
+        À appeler après une modification de la grille qui ne passe pas par set_element.
+        """
+        self._candidates = None
+        self._initial_candidates = None
+
     def get_9x9(self) -> list[list[Box]]:
         """
-        Retourne la grille sous forme de liste 9x9 d'objets Box.
+        Retourne la grille sous forme de liste size x size d'objets Box (vues sur les valeurs compactes),
+        9x9 pour une grille standard.
         
         Returns:
             list[list[Box]]: La grille de Sudoku.
         """
         return self.grid
 
-    def get_81(self, rb: int = 0, cb: int = 0, row: int = 0, col: int = 0, g: list[Box] = None) -> list[Box]:
+    def get_81(self) -> list[Box]:
         """
-        Retourne la grille sous forme de liste linéaire de 81 objets Box.
-        
-        Args:
-            rb (int): Bloc de ligne.
-            cb (int): Bloc de colonne.
-            row (int): Ligne dans le bloc.
-            col (int): Colonne dans le bloc.
-            g (list[Box]): Liste des cases.
+        Retourne la grille sous forme de liste linéaire de size * size objets Box, bloc par bloc,
+        dans l'ordre précalculé units.Layout.box_order.
         
         Returns:
             list[Box]: La grille de Sudoku sous forme linéaire.
         """
-        if g is None:
-            g = []
-        if rb == 3:
-            return g
-        if cb == 3:
-            return self.get_81(rb + 1, 0, 0, 0, g)
-        if row == 3:
-            return self.get_81(rb, cb + 1, 0, 0, g)
-        if col == 3:
-            return self.get_81(rb, cb, row + 1, 0, g)
-        
-        g.append(self.grid[rb*3 + row][cb*3 + col])
-        return self.get_81(rb, cb, row, col + 1, g)
+        views = self.grid
+        size = self.size
+        return [views[index // size][index % size] for index in self.layout.box_order]
     
-    def is_solved(self, row: int = 0, col: int = 0) -> bool:
+    def is_solved(self) -> bool:
         """
-        Vérifie si la grille est résolue.
-        
-        Args:
-            row (int): Ligne actuelle.
-            col (int): Colonne actuelle.
+        Vérifie si la grille est résolue, en un seul passage sur les unités (27 pour une grille 9x9) :
+        chaque unité doit contenir tous les chiffres, c'est-à-dire que le masque de ses valeurs
+        doit être complet.
         
         Returns:
             bool: True si la grille est résolue, sinon False.
         """
-        if row > 8:
-            return True
-        
-        value = self.grid[row][col].value
-
-        if not (1 <= value <= 9):
+        values = self.values
+        if values.find(0) != -1:
             return False
-        
-        for test in range(9):
-            if (test != col and value == self.grid[row][test].value) or (row != test and self.grid[test][col].value == value):
+        full = self.layout.full
+        for unit in self.layout.units:
+            mask = 0
+            for index in unit:
+                mask |= 1 << (values[index] - 1)
+            # Un chiffre en double laisse un bit vide, un chiffre trop grand ajoute un bit
+            if mask != full:
                 return False
+        return True
 
-        # Vérifie le bloc 3x3
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(3):
-            for j in range(3):
-                if i != row%3 or j != col%3:
-                    if self.grid[start_row + i][start_col + j].value == value:
-                        return False
-        
-        return self.is_solved(row+(1 if col==8 else 0), (col+1)%9)
-                
-g = Grid()
-print(g.generate(0))
\ No newline at end of file
+
+@lru_cache(maxsize=256)
+def puzzle_from_seed(seed: int, level: int, unique: bool = True) -> tuple[bytes, bytes]:
+    """
+    Régénère la grille déterminée par (seed, level, unique). Les résultats récents sont gardés
+    en mémoire, ce qui permet de ne stocker que la graine d'une grille.
+    
+    Args:
+        seed (int): Graine de la grille (un entier de 64 bits suffit).
+        level (int): Nombre de cases à vider.
+        unique (bool): Transmis à Grid.generate.
+    
+    Returns:
+        tuple[bytes, bytes]: L'instantané de la grille (voir Grid.snapshot) et sa solution.
+    """
+    grid = Grid()
+    grid.generate(level, unique=unique, seed=seed)
+    return grid.snapshot(), bytes(grid.solution)
+
+
+@lru_cache(maxsize=16)
+def make_seeds(count: int, level: int, unique: bool = True, band: tuple[int, int | None] = None,
+               seed: int = 0) -> tuple[tuple[bytes, bytes, Rating | None], ...]:
+    """
+    Génère les grilles d'origine de Grid.generate_from. La grille i utilise la graine seed + i, ce qui
+    permet à plusieurs processus de construire la même réserve ; les réserves récentes sont gardées en mémoire.
+    
+    Args:
+        count (int): Nombre de grilles.
+        level (int): Transmis à Grid.generate.
+        unique (bool): Transmis à Grid.generate.
+        band (tuple[int, int | None]): Transmis à Grid.generate.
+        seed (int): Graine de la première grille.
+    
+    Returns:
+        tuple[tuple[bytes, bytes, Rating | None], ...]: Les valeurs données, solutions et notes des grilles.
+    """
+    grid = Grid()
+    seeds = []
+    for index in range(count):
+        grid.generate(level, unique=unique, seed=seed + index, band=band)
+        seeds.append((bytes(grid.values), bytes(grid.solution), grid.rating))
+    return tuple(seeds)
+
+
+if __name__ == "__main__":
+    g = Grid()
+    g.generate(0)
+    print(g)
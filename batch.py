@@ -0,0 +1,134 @@
+import numpy as np
+
+from backend import Grid
+
+# Tables de correspondance pour les masques de 9 bits
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(512)], dtype=np.uint8)  # Nombre de chiffres du masque
+DIGIT = np.zeros(512, dtype=np.uint8)  # Chiffre correspondant à un masque d'un seul bit
+for number in range(1, 10):
+    DIGIT[1 << (number - 1)] = number
+
+
+def _as_batch(grids) -> np.ndarray:
+    """
+    Convertit l'entrée en tableau (N, 9, 9) d'entiers non signés.
+
+    Args:
+        grids: Tableau ou liste de grilles 9x9 (0 pour une case vide).
+
+    Returns:
+        np.ndarray: Les grilles sous forme de tableau (N, 9, 9) de type uint8.
+    """
+    grids = np.asarray(grids, dtype=np.uint8)
+    if grids.ndim != 3 or grids.shape[1:] != (9, 9):
+        raise ValueError(f"Tableau (N, 9, 9) attendu, reçu {grids.shape}")
+    return grids
+
+
+def _bits(grids: np.ndarray) -> np.ndarray:
+    """
+    Transforme chaque valeur en masque de bits (bit n - 1 pour le chiffre n, 0 pour une case vide).
+
+    Args:
+        grids (np.ndarray): Grilles (N, 9, 9) de valeurs entre 0 et 9.
+
+    Returns:
+        np.ndarray: Masques (N, 9, 9) de type uint16.
+    """
+    return np.left_shift(np.uint16(1), grids.astype(np.uint16)) >> 1
+
+
+def _boxes(array: np.ndarray) -> np.ndarray:
+    """
+    Regroupe les cases par bloc 3x3.
+
+    Args:
+        array (np.ndarray): Tableau (N, 9, 9).
+
+    Returns:
+        np.ndarray: Tableau (N, 9, 9) où array[n, b] contient les 9 cases du bloc b.
+    """
+    return array.reshape(-1, 3, 3, 3, 3).swapaxes(2, 3).reshape(-1, 9, 9)
+
+
+def validate_batch(grids) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vérifie N grilles en une seule passe vectorisée.
+
+    Une unité ne contient pas de doublon si la somme des masques de ses cases est égale
+    à leur OU binaire.
+
+    Args:
+        grids: Tableau (N, 9, 9) de valeurs entre 0 et 9.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Deux tableaux de N booléens : grille valide
+        (aucun doublon, valeurs entre 0 et 9) et grille résolue (valide et complète).
+    """
+    grids = _as_batch(grids)
+    bits = _bits(grids)
+    valid = (grids <= 9).all(axis=(1, 2))
+    for units in (bits, bits.swapaxes(1, 2), _boxes(bits)):
+        valid &= (units.sum(axis=2, dtype=np.uint16) == np.bitwise_or.reduce(units, axis=2)).all(axis=1)
+    solved = valid & (grids > 0).all(axis=(1, 2))
+    return valid, solved
+
+
+def candidate_masks(grids) -> np.ndarray:
+    """
+    Calcule les chiffres possibles de chaque case des N grilles.
+
+    Args:
+        grids: Tableau (N, 9, 9) de valeurs entre 0 et 9.
+
+    Returns:
+        np.ndarray: Masques (N, 9, 9) de type uint16, bit n - 1 à 1 si le chiffre n est possible.
+        Les cases déjà remplies ont un masque nul.
+    """
+    grids = _as_batch(grids)
+    bits = _bits(grids)
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    boxes = np.bitwise_or.reduce(_boxes(bits), axis=2).reshape(-1, 3, 3)
+    used = rows[:, :, None] | cols[:, None, :] | np.repeat(np.repeat(boxes, 3, axis=1), 3, axis=2)
+    return np.where(grids == 0, ~used & 0x1FF, 0).astype(np.uint16)
+
+
+def solve_batch(grids) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Résout N grilles : les singletons nus sont remplis pour toutes les grilles à la fois,
+    puis les grilles encore incomplètes sont terminées une à une avec Grid.solve("mrv").
+
+    Args:
+        grids: Tableau (N, 9, 9) de valeurs entre 0 et 9.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Les grilles (N, 9, 9) complétées et un tableau de N booléens
+        indiquant celles qui ont été résolues.
+    """
+    grids = _as_batch(grids).copy()
+    valid, _ = validate_batch(grids)
+    active = valid.copy()
+
+    # Propagation vectorisée des singletons nus, tant qu'au moins une grille progresse
+    while active.any():
+        indices = np.flatnonzero(active)
+        sub = grids[indices]
+        candidates = candidate_masks(sub)
+        empty = sub == 0
+        dead = (empty & (candidates == 0)).any(axis=(1, 2))
+        singles = empty & (POPCOUNT[candidates] == 1) & ~dead[:, None, None]
+        sub[singles] = DIGIT[candidates[singles]]
+        grids[indices] = sub
+        # Deux singletons d'une même unité peuvent porter le même chiffre : on revalide
+        valid[indices] = ~dead & validate_batch(sub)[0]
+        active[indices] = valid[indices] & singles.any(axis=(1, 2))
+
+    _, solved = validate_batch(grids)
+    for index in np.flatnonzero(valid & ~solved):
+        grid = Grid()
+        grid.load(grids[index].ravel())
+        if grid.solve("mrv"):
+            grids[index] = np.frombuffer(grid.values, dtype=np.uint8).reshape(9, 9)
+            solved[index] = True
+    return grids, solved
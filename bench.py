@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from random import Random
+
+from backend import Grid, make_seeds
+from cache import SolveCache
+from symmetry import Transform, canonical_form
+
+# Grilles de référence, fixes pour que les mesures restent comparables d'une exécution à l'autre
+CORPORA = {
+    "easy": [
+        "003020600900305001001806400008102900700000008006708200002609500800203009005010300",
+        "1.379.......615..46453.891.3..9.742.9....2738..2....69836.7.14572..51..351.4.68.2",
+        "85...236.397.548..62.78.594..83.597...5..6.812.9..8.53.835..6....2.61735..6.3..48",
+    ],
+    "medium": [
+        "78.46.325.....971...5..74..647...5...3....9..9.......1.2.1...744...2......1.4.29.",
+        "..9.....572...9.3..18753.9.1............3251....6.128...4..6.....159...36.3..4..8",
+        "....5...14......565987.1.2.9.7.8234.6854.3...3..1..6.7...9.......3..7.6.......7..",
+    ],
+    "hard": [
+        "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+        "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+        "85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.",
+        "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    ],
+    # Grille conçue pour piéger un backtracking qui parcourt les cases dans l'ordre
+    "worst_case": [
+        "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+    ],
+}
+
+# Grilles presque vides : leurs nombreuses transformations équivalentes ont longtemps rendu
+# le calcul de la forme canonique extrêmement lent
+SPARSE = {
+    "empty": "." * 81,
+    "one_clue": "." * 40 + "5" + "." * 40,
+    "one_box": "123......456......789" + "." * 60,
+}
+
+LEVELS = [35, 50, 65]
+
+
+def measure(function, setup=None, repeat: int = 20) -> dict:
+    """
+    Chronomètre une fonction et mesure la mémoire allouée lors d'une exécution supplémentaire.
+
+    Args:
+        function: Fonction sans argument à mesurer.
+        setup: Fonction sans argument appelée avant chaque mesure, hors chronométrage.
+        repeat (int): Nombre de mesures.
+
+    Returns:
+        dict: Moyenne, médiane (p50), p99, minimum et maximum en microsecondes, et pic d'allocation en octets.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        function()
+        timings.append((time.perf_counter_ns() - start) / 1000)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "mean_us": statistics.fmean(timings),
+        "p50_us": timings[len(timings) // 2],
+        "p99_us": timings[min(len(timings) - 1, int(0.99 * len(timings)))],
+        "min_us": timings[0],
+        "max_us": timings[-1],
+        "peak_alloc_bytes": peak,
+        "repeat": repeat,
+    }
+
+
+def bench_backend(seed: int, repeat: int, methods: list[str]) -> dict:
+    """
+    Mesure les fonctions du backend sur les grilles de référence.
+
+    Args:
+        seed (int): Graine du générateur aléatoire, réinitialisée avant chaque mesure.
+        repeat (int): Nombre de mesures par fonction.
+        methods (list[str]): Méthodes de Grid.solve à mesurer.
+
+    Returns:
+        dict: Les résultats, indexés par nom de mesure.
+    """
+    results = {}
+    grid = Grid(Random(seed))
+    cache = SolveCache()
+
+    for level in LEVELS:
+        grid.rng.seed(seed)
+        results[f"generate/{level}"] = measure(lambda: grid.generate(level), repeat=repeat)
+        grid.rng.seed(seed)
+        results[f"generate_unique/{level}"] = measure(lambda: grid.generate(level, unique=True), repeat=repeat)
+        seeds = make_seeds(8, level, seed=seed)
+        results[f"generate_from/{level}"] = measure(lambda: grid.generate_from(seeds), repeat=repeat)
+
+    for corpus, puzzles in CORPORA.items():
+        for index, puzzle in enumerate(puzzles):
+            name = f"{corpus}/{index}"
+            solutions = set()
+            for method in methods:
+                grid.rng.seed(seed)
+                results[f"solve_{method}/{name}"] = measure(
+                    lambda: grid.solve(method), setup=lambda: grid.load_string(puzzle), repeat=repeat
+                )
+                solutions.add(grid.to_string())
+            # Les méthodes se vérifient mutuellement (les grilles de référence ont une solution unique)
+            if len(solutions) > 1:
+                print(f"{name} : les méthodes {', '.join(methods)} donnent des solutions différentes", file=sys.stderr)
+
+            grid.load_string(puzzle)
+            cells = [(col, row, number) for row in range(9) for col in range(9) for number in range(1, 10)]
+            results[f"is_valid_x729/{name}"] = measure(
+                lambda: [grid.is_valid(col, row, number) for col, row, number in cells], repeat=repeat
+            )
+
+            values = bytes(grid.values)
+            cache.solve(values)
+            results[f"cache_hit/{name}"] = measure(lambda: cache.solve(values), repeat=repeat)
+
+            grid.solve("mrv")
+            results[f"is_solved/{name}"] = measure(grid.is_solved, repeat=repeat)
+            results[f"get_81/{name}"] = measure(grid.get_81, repeat=repeat)
+
+    puzzles = {**SPARSE, **{f"{corpus}/0": puzzles[0] for corpus, puzzles in CORPORA.items()}}
+    for name, puzzle in puzzles.items():
+        grid.load_string(puzzle)
+        values = bytes(grid.values)
+        results[f"canonical/{name}"] = measure(lambda: canonical_form(values), repeat=repeat)
+        # Une grille transformée doit avoir la même forme canonique
+        if canonical_form(Transform.random(Random(seed)).apply(values)) != canonical_form(values):
+            print(f"{name} : la forme canonique change après une transformation", file=sys.stderr)
+    return results
+
+
+def bench_ui(repeat: int) -> dict:
+    """
+    Mesure BigGrid.set_grid_value et BigGrid.update_cell sans ouvrir de fenêtre Kivy.
+
+    Args:
+        repeat (int): Nombre de mesures.
+
+    Returns:
+        dict: Les résultats, ou un dictionnaire vide si Kivy n'est pas installé.
+    """
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    try:
+        import main
+    except ImportError:
+        return {}
+
+    screen = main.GameScreen(None, name="game")
+    results = {}
+    for corpus, puzzles in CORPORA.items():
+        main.GRID_BACKEND.load_string(puzzles[0])
+        results[f"set_grid_value/{corpus}"] = measure(screen.grid.set_grid_value, repeat=repeat)
+        row, col = main.GRID_BACKEND.find_empty_cell()
+        results[f"update_cell/{corpus}"] = measure(lambda: screen.grid.update_cell(row, col), repeat=repeat)
+    return results
+
+
+def main() -> None:
+    """
+    Point d'entrée : lance les mesures, affiche un résumé et écrit les résultats au format JSON.
+    """
+    parser = argparse.ArgumentParser(description="Mesures de performance de Sudokube.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Graine du générateur aléatoire.")
+    parser.add_argument("-r", "--repeat", type=int, default=20, help="Nombre de mesures par fonction.")
+    parser.add_argument("--methods", default="mrv,dlx",
+                        help="Méthodes de Grid.solve à mesurer, séparées par des virgules "
+                             "('random' est très lent sur le corpus worst_case).")
+    parser.add_argument("--no-ui", action="store_true", help="Ne pas mesurer l'interface Kivy.")
+    parser.add_argument("-o", "--output", default=None, help="Fichier JSON de résultats.")
+    args = parser.parse_args()
+
+    results = bench_backend(args.seed, args.repeat, args.methods.split(","))
+    if not args.no_ui:
+        results.update(bench_ui(args.repeat))
+
+    for name, result in results.items():
+        print(f"{name:40} mean {result['mean_us']:>11.1f} us  p50 {result['p50_us']:>11.1f} us  "
+              f"p99 {result['p99_us']:>11.1f} us  peak {result['peak_alloc_bytes']:>9} B")
+
+    if args.output:
+        report = {
+            "python": sys.version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
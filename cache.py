@@ -0,0 +1,215 @@
+import dbm
+import struct
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+
+from backend import Grid
+from rating import rate
+
+# Encodage d'un résultat pour le cache sur le disque : nombre de solutions, note, solution
+RESULT = struct.Struct("<BH81s")
+NO_RATING = 0xFFFF
+
+
+# Résultat de la résolution d'une grille
+class SolveResult:
+    def __init__(self, solution: bytes | None, count: int, rating: int | None):
+        """
+        Initialise un résultat.
+
+        Args:
+            solution (bytes | None): Les 81 chiffres d'une solution, ou None si la grille n'en a pas.
+            count (int): Nombre de solutions, compté jusqu'à 2 (2 signifie « au moins deux »).
+            rating (int | None): Note de difficulté (voir rating.rate), None si elle n'a pas été calculée
+                ou si la solution n'est pas unique.
+        """
+        self.solution = solution
+        self.count = count
+        self.rating = rating
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns:
+            bytes: Le résultat encodé sur RESULT.size octets.
+        """
+        return RESULT.pack(self.count, NO_RATING if self.rating is None else min(self.rating, NO_RATING - 1),
+                           self.solution or bytes(81))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SolveResult":
+        """
+        Args:
+            data (bytes): Un résultat encodé par to_bytes.
+
+        Returns:
+            SolveResult: Le résultat décodé.
+        """
+        count, rating, solution = RESULT.unpack(data)
+        return cls(solution if count else None, count, None if rating == NO_RATING else rating)
+
+
+def solve_key(values: bytes) -> bytes:
+    """
+    Args:
+        values (bytes): Les 81 valeurs données de la grille.
+
+    Returns:
+        bytes: Empreinte de 16 octets des valeurs données.
+    """
+    return blake2b(bytes(values), digest_size=16).digest()
+
+
+def analyze(values: bytes, rated: bool = False) -> SolveResult:
+    """
+    Résout une grille : compte ses solutions (jusqu'à 2) et en garde une.
+
+    Args:
+        values (bytes): Les 81 valeurs données de la grille.
+        rated (bool): Noter aussi la grille si sa solution est unique.
+
+    Returns:
+        SolveResult: Le résultat.
+    """
+    grid = Grid()
+    grid.load(values)
+    count = grid.count_solutions(2)
+    if count == 0:
+        return SolveResult(None, 0, None)
+    rating = rate(grid) if rated and count == 1 else None
+    grid.solve_mrv()
+    return SolveResult(bytes(grid.values), count, rating.score if rating is not None else None)
+
+
+# Cache des résultats de résolution, indexé par l'empreinte des valeurs données : les résultats
+# récents sont gardés en mémoire (au plus size, les plus anciennement utilisés étant oubliés),
+# et tous les résultats sur le disque si un fichier est ouvert
+class SolveCache:
+    def __init__(self, size: int = 4096, path: str = None):
+        """
+        Initialise un cache vide.
+
+        Args:
+            size (int): Nombre maximal de résultats gardés en mémoire.
+            path (str): Fichier dbm où conserver les résultats d'une exécution à l'autre (aucun si None).
+        """
+        self.size = size
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.disk = None
+        self.hits = self.misses = 0
+        if path is not None:
+            self.open(path)
+
+    def open(self, path: str) -> None:
+        """
+        Ouvre (ou crée) le fichier dbm des résultats.
+
+        Args:
+            path (str): Chemin du fichier.
+        """
+        with self.lock:
+            self.disk = dbm.open(path, "c")
+
+    def close(self) -> None:
+        """
+        Ferme le fichier dbm des résultats. Le cache en mémoire reste utilisable.
+        """
+        with self.lock:
+            if self.disk is not None:
+                self.disk.close()
+                self.disk = None
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def get(self, values: bytes) -> SolveResult | None:
+        """
+        Args:
+            values (bytes): Les 81 valeurs données de la grille.
+
+        Returns:
+            SolveResult | None: Le résultat mémorisé, ou None s'il est inconnu.
+        """
+        key = solve_key(values)
+        with self.lock:
+            result = self.results.get(key)
+            if result is not None:
+                self.results.move_to_end(key)
+                self.hits += 1
+                return result
+            if self.disk is not None:
+                data = self.disk.get(key)
+                if data is not None:
+                    result = SolveResult.from_bytes(data)
+                    self.remember(key, result)
+                    self.hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, values: bytes, result: SolveResult) -> None:
+        """
+        Mémorise un résultat.
+
+        Args:
+            values (bytes): Les 81 valeurs données de la grille.
+            result (SolveResult): Son résultat.
+        """
+        key = solve_key(values)
+        with self.lock:
+            self.remember(key, result)
+            if self.disk is not None:
+                self.disk[key] = result.to_bytes()
+
+    def remember(self, key: bytes, result: SolveResult) -> None:
+        """
+        Ajoute un résultat en mémoire et oublie le plus anciennement utilisé au-delà de size.
+        À appeler avec le verrou acquis.
+
+        Args:
+            key (bytes): Empreinte des valeurs données.
+            result (SolveResult): Le résultat.
+        """
+        self.results[key] = result
+        self.results.move_to_end(key)
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
+
+    def solve(self, values: bytes) -> SolveResult:
+        """
+        Renvoie le résultat mémorisé, ou résout la grille et mémorise son résultat.
+
+        Args:
+            values (bytes): Les 81 valeurs données de la grille.
+
+        Returns:
+            SolveResult: Le résultat.
+        """
+        values = bytes(values)
+        result = self.get(values)
+        if result is None:
+            result = analyze(values)
+            self.put(values, result)
+        return result
+
+    def rate(self, values: bytes) -> int | None:
+        """
+        Renvoie la note mémorisée, ou note la grille et mémorise sa note avec sa solution.
+
+        Args:
+            values (bytes): Les 81 valeurs données de la grille.
+
+        Returns:
+            int | None: La note (voir rating.rate), ou None si la grille n'a pas de solution unique.
+        """
+        values = bytes(values)
+        result = self.get(values)
+        if result is None or result.count == 1 and result.rating is None:
+            result = analyze(values, rated=True)
+            self.put(values, result)
+        return result.rating
+
+
+# Cache partagé par le jeu et les outils
+SOLVE_CACHE = SolveCache()
@@ -0,0 +1,401 @@
+import argparse
+import json
+import mmap
+import os
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from multiprocessing import Pool
+
+from backend import SOLVE_METHODS, Grid, make_seeds
+from cache import SolveCache, SolveResult
+from store import PuzzleStore
+from symmetry import CanonicalSet, canonical_key
+
+# Conversion des caractères d'une grille ('.' ou '0' pour une case vide) en valeurs, et inversement
+DIGITS = bytes.maketrans(b".0123456789", bytes(1) + bytes(range(10)))
+CHARACTERS = bytes.maketrans(bytes(range(10)), b"0123456789")
+
+
+def generate_chunk(task: tuple[int, int, dict]) -> list[tuple[int, str, str, int | None, int | None]]:
+    """
+    Génère un paquet de grilles dans un processus de travail. La grille i du paquet utilise
+    la graine first_seed + i : chaque grille ne dépend que de sa graine et des options.
+
+    Args:
+        task (tuple[int, int, dict]): (graine de la première grille, nombre de grilles, options). Les options
+            sont le niveau ('level'), l'unicité ('unique'), la fourchette de notes ou None ('band'), le calcul
+            de l'empreinte canonique ('distinct'), et le nombre de grilles d'origine à transformer ('seeds',
+            0 pour générer chaque grille entièrement) générées à partir de la graine 'pool_seed'.
+
+    Returns:
+        list[tuple[int, str, str, int | None, int | None]]: Les graines, grilles et solutions sur 81 caractères,
+        la note de chaque grille (None sans fourchette, ou si la fourchette n'a pas été atteinte) et son
+        empreinte canonique (None si elle n'est pas demandée).
+    """
+    first_seed, count, options = task
+    grid = Grid()
+    seeds = None
+    if options["seeds"]:
+        seeds = make_seeds(options["seeds"], options["level"], options["unique"], options["band"], options["pool_seed"])
+    puzzles = []
+    for seed in range(first_seed, first_seed + count):
+        if seeds is not None:
+            grid.generate_from(seeds, seed=seed)
+        else:
+            grid.generate(options["level"], unique=options["unique"], seed=seed, band=options["band"])
+        score = grid.rating.score if grid.rating is not None else None
+        key = canonical_key(grid.values) if options["distinct"] else None
+        puzzles.append((seed, grid.to_string(), grid.to_string(grid.solution), score, key))
+    return puzzles
+
+
+def parse_band(text: str) -> tuple[int, int | None]:
+    """
+    Args:
+        text (str): Fourchette de notes sous la forme 'MIN:MAX' ou 'MIN:' (sans maximum).
+
+    Returns:
+        tuple[int, int | None]: La note minimale et la note maximale (None si absente).
+    """
+    low, _, high = text.partition(":")
+    try:
+        return int(low or 0), int(high) if high else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fourchette invalide : {text!r}")
+
+
+def solve_chunk(task: tuple[list[bytes], str, bool]) -> tuple[list[str | None], list[float], list[int | None]]:
+    """
+    Résout un paquet de grilles dans un processus de travail.
+
+    Args:
+        task (tuple[list[bytes], str, bool]): Les grilles sur 81 caractères ('.' ou '0' pour une case vide),
+            la méthode de Grid.solve et le comptage des solutions (jusqu'à 2) de chaque grille, pour le cache.
+
+    Returns:
+        tuple[list[str | None], list[float], list[int | None]]: Les solutions sur 81 caractères (None si
+        la grille est invalide ou sans solution), le temps de résolution de chaque grille, en secondes, et
+        leurs nombres de solutions (None s'ils ne sont pas comptés, ou si la grille est invalide).
+    """
+    lines, method, counted = task
+    grid = Grid()
+    solutions, latencies, counts = [], [], []
+    for line in lines:
+        start = time.perf_counter()
+        count = None
+        try:
+            grid.load_string(line.decode("ascii"))
+            if counted:
+                count = grid.count_solutions(2)
+            solution = grid.to_string() if count != 0 and grid.solve(method) else None
+        except (UnicodeDecodeError, ValueError):
+            solution = None
+        latencies.append(time.perf_counter() - start)
+        solutions.append(solution)
+        counts.append(count)
+    return solutions, latencies, counts
+
+
+def cached_chunks(chunks, cache: SolveCache | None, method: str, pending: deque):
+    """
+    Prépare les tâches de solve_chunk. Avec un cache, les grilles déjà résolues n'y sont pas envoyées :
+    leurs solutions sont rangées dans pending avec les valeurs des autres grilles, dans l'ordre des tâches.
+
+    Args:
+        chunks: Itérable des paquets de lignes (voir read_chunks).
+        cache (SolveCache | None): Le cache des résultats (aucun si None).
+        method (str): Méthode de Grid.solve.
+        pending (deque): Reçoit pour chaque tâche la liste des lignes du paquet, chacune sous la forme
+            (solution, temps de recherche) si elle a été trouvée dans le cache, sinon (valeurs, None).
+
+    Yields:
+        tuple[list[bytes], str, bool]: Les tâches de solve_chunk.
+    """
+    for lines in chunks:
+        if cache is None:
+            pending.append(None)
+            yield lines, method, False
+            continue
+        entries, misses = [], []
+        for line in lines:
+            start = time.perf_counter()
+            values = line.translate(DIGITS)
+            result = cache.get(values) if len(values) == 81 and max(values) <= 9 else None
+            if result is None:
+                entries.append((values, None))
+                misses.append(line)
+            else:
+                solution = result.solution.translate(CHARACTERS).decode("ascii") if result.solution else None
+                entries.append((solution, time.perf_counter() - start))
+        pending.append(entries)
+        yield misses, method, True
+
+
+def read_chunks(stream, size: int):
+    """
+    Lit les grilles d'un flux binaire, une par ligne, par paquets de size lignes.
+    Les lignes vides et les commentaires commençant par '#' sont ignorés.
+
+    Args:
+        stream: Flux binaire (fichier, mmap ou entrée standard) disposant de readline.
+        size (int): Nombre de grilles par paquet.
+
+    Yields:
+        list[bytes]: Les paquets de lignes.
+    """
+    chunk = []
+    for line in iter(stream.readline, b""):
+        line = line.strip()
+        if not line or line.startswith(b"#"):
+            continue
+        chunk.append(line)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def percentile(values: list[float], ratio: float) -> float:
+    """
+    Args:
+        values (list[float]): Valeurs triées par ordre croissant (non vide).
+        ratio (float): Rang recherché entre 0 et 1.
+
+    Returns:
+        float: La valeur au rang demandé.
+    """
+    return values[min(len(values) - 1, int(ratio * len(values)))]
+
+
+def run_ordered(pool: Pool, function, tasks, window: int):
+    """
+    Soumet les tâches au pool en gardant au plus window tâches en cours, et renvoie les résultats
+    dans l'ordre de soumission. Les tâches ne sont créées qu'au fur et à mesure que les résultats
+    sont consommés, ce qui limite la mémoire si la sortie est lente.
+
+    Args:
+        pool (Pool): Le pool de processus.
+        function: La fonction à appliquer à chaque tâche.
+        tasks: Itérable des tâches.
+        window (int): Nombre maximal de tâches en cours.
+
+    Yields:
+        Les résultats des tâches, dans l'ordre.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(function, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def open_output(path: str | None):
+    """
+    Ouvre le fichier de sortie, ou renvoie la sortie standard si aucun chemin n'est donné.
+
+    Args:
+        path (str | None): Chemin du fichier, ou None / '-' pour la sortie standard.
+
+    Returns:
+        Le flux de sortie texte.
+    """
+    if path is None or path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="\n")
+
+
+def command_generate(args: argparse.Namespace) -> None:
+    """
+    Génère args.count grilles en parallèle et les écrit au fil de l'eau.
+
+    Args:
+        args (argparse.Namespace): Arguments de la ligne de commande.
+    """
+    base_seed = args.seed if args.seed is not None else random.randrange(2 ** 63)
+    options = {
+        "level": args.level, "unique": args.unique, "band": args.band, "distinct": args.distinct,
+        "seeds": args.seeds, "pool_seed": base_seed,
+    }
+    chunks = [
+        (base_seed + start, min(args.chunk, args.count - start), options)
+        for start in range(0, args.count, args.chunk)
+    ]
+    output = open_output(args.output)
+    store = PuzzleStore(args.store) if args.store else None
+    seen = CanonicalSet()
+    start = time.perf_counter()
+    written = duplicates = equivalents = 0
+    try:
+        with Pool(args.workers) as pool:
+            for puzzles in run_ordered(pool, generate_chunk, chunks, 2 * args.workers):
+                for seed, puzzle, solution, score, key in puzzles:
+                    if key is not None and not seen.add_key(key):
+                        equivalents += 1
+                        continue
+                    if store is not None and store.add(
+                        puzzle.encode("ascii").translate(DIGITS), solution.encode("ascii").translate(DIGITS), score
+                    ) is None:
+                        duplicates += 1
+                        continue
+                    written += 1
+                    if args.format == "ndjson":
+                        output.write(json.dumps({
+                            "puzzle": puzzle, "solution": solution, "level": args.level, "seed": seed, "rating": score
+                        }) + "\n")
+                    else:
+                        output.write(puzzle + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if store is not None:
+            store.close()
+    elapsed = time.perf_counter() - start
+    print(f"{written} grilles en {elapsed:.2f} s ({written / elapsed:.1f} grilles/s, "
+          f"{args.workers} processus, graine {base_seed})", file=sys.stderr)
+    if args.distinct:
+        print(f"{equivalents} grilles équivalentes à une grille déjà écrite ignorées", file=sys.stderr)
+    if store is not None:
+        print(f"{duplicates} grilles déjà présentes dans {args.store} ignorées", file=sys.stderr)
+
+
+def command_solve(args: argparse.Namespace) -> None:
+    """
+    Résout en parallèle les grilles d'un fichier (ou de l'entrée standard) et écrit les solutions
+    dans l'ordre d'entrée, une par ligne. Une grille invalide ou sans solution donne une ligne vide.
+
+    Args:
+        args (argparse.Namespace): Arguments de la ligne de commande.
+    """
+    source = None
+    if args.input is None or args.input == "-":
+        stream = sys.stdin.buffer
+    else:
+        source = open(args.input, "rb")
+        # Un fichier vide ne peut pas être projeté en mémoire
+        stream = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(source.fileno()).st_size else source
+    output = open_output(args.output)
+    cache = SolveCache(path=args.cache) if args.cache else None
+    latencies = array("d")
+    solved = failed = 0
+    start = time.perf_counter()
+    pending = deque()
+    tasks = cached_chunks(read_chunks(stream, args.chunk), cache, args.method, pending)
+    try:
+        with Pool(args.workers) as pool:
+            for solutions, times, counts in run_ordered(pool, solve_chunk, tasks, 2 * args.workers):
+                entries = pending.popleft()
+                if entries is not None:
+                    # Réinsertion des grilles trouvées dans le cache, et mémorisation des autres
+                    found = iter(zip(solutions, times, counts))
+                    solutions, times = [], []
+                    for first, elapsed in entries:
+                        if elapsed is None:
+                            solution, elapsed, count = next(found)
+                            if count is not None:
+                                cache.put(first, SolveResult(
+                                    solution.encode("ascii").translate(DIGITS) if solution else None, count, None
+                                ))
+                            first = solution
+                        solutions.append(first)
+                        times.append(elapsed)
+                for solution in solutions:
+                    output.write((solution or "") + "\n")
+                    if solution is None:
+                        failed += 1
+                    else:
+                        solved += 1
+                latencies.extend(times)
+                output.flush()
+    finally:
+        if source is not None:
+            if stream is not source:
+                stream.close()
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+        if cache is not None:
+            cache.close()
+    elapsed = time.perf_counter() - start
+    total = solved + failed
+    print(f"{total} grilles en {elapsed:.2f} s ({total / elapsed:.1f} grilles/s, {args.workers} processus), "
+          f"{solved} résolues, {failed} invalides ou sans solution", file=sys.stderr)
+    if cache is not None:
+        print(f"cache : {cache.hits} grilles déjà résolues, {cache.misses} résolues", file=sys.stderr)
+    if latencies:
+        ordered = sorted(latencies)
+        print("latence : " + ", ".join(
+            f"{name} {percentile(ordered, ratio) * 1000:.3f} ms"
+            for name, ratio in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+        ), file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Construit l'analyseur des arguments de la ligne de commande.
+
+    Returns:
+        argparse.ArgumentParser: L'analyseur avec ses sous-commandes.
+    """
+    parser = argparse.ArgumentParser(prog="cli.py", description="Outils Sudokube en ligne de commande.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Génère des grilles en parallèle.")
+    generate.add_argument("-n", "--count", type=int, default=1000, help="Nombre de grilles à générer.")
+    generate.add_argument("-l", "--level", type=int, default=50, help="Nombre de cases à vider.")
+    generate.add_argument("--unique", action="store_true", help="Ne garder que des grilles à solution unique.")
+    generate.add_argument("-b", "--band", type=parse_band, default=None,
+                          help="Fourchette de notes visée, 'MIN:MAX' ou 'MIN:' (implique --unique).")
+    generate.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus.")
+    generate.add_argument("-s", "--seed", type=int, default=None,
+                          help="Graine de la première grille, les suivantes utilisant les graines suivantes "
+                               "(aléatoire par défaut).")
+    generate.add_argument("--chunk", type=int, default=50, help="Nombre de grilles par tâche.")
+    generate.add_argument("-f", "--format", choices=("lines", "ndjson"), default="lines", help="Format de sortie.")
+    generate.add_argument("-o", "--output", default=None, help="Fichier de sortie (sortie standard par défaut).")
+    # Les grilles transformées sont toutes équivalentes à l'une des grilles d'origine : --distinct n'en garderait
+    # que les grilles d'origine
+    variants = generate.add_mutually_exclusive_group()
+    variants.add_argument("--seeds", type=int, default=0,
+                          help="Générer ce nombre de grilles d'origine, puis chaque grille en transformant l'une "
+                               "d'elles au hasard (rapide, même unicité et note recalculée ; 0 pour tout générer).")
+    variants.add_argument("--distinct", action="store_true",
+                          help="Ignorer les grilles équivalentes (à une transformation près, voir symmetry.py) "
+                               "à une grille déjà écrite.")
+    generate.add_argument("--store", default=None,
+                          help="Dossier d'une réserve de grilles (voir store.py) où ajouter les grilles ; "
+                               "celles qui y sont déjà ne sont pas écrites.")
+    generate.set_defaults(handler=command_generate)
+
+    solve = commands.add_parser("solve", help="Résout des grilles de 81 caractères, une par ligne.")
+    solve.add_argument("input", nargs="?", default=None, help="Fichier d'entrée (entrée standard par défaut).")
+    solve.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus.")
+    solve.add_argument("--chunk", type=int, default=200, help="Nombre de grilles par tâche.")
+    solve.add_argument("-m", "--method", choices=SOLVE_METHODS, default="mrv", help="Méthode de résolution.")
+    solve.add_argument("-o", "--output", default=None, help="Fichier de sortie (sortie standard par défaut).")
+    solve.add_argument("--cache", default=None,
+                       help="Fichier dbm des résultats (voir cache.py) : les grilles déjà résolues, lors de cette "
+                            "exécution ou d'une précédente, n'y sont pas résolues à nouveau.")
+    solve.set_defaults(handler=command_solve)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Point d'entrée de la ligne de commande.
+
+    Args:
+        argv (list[str] | None): Arguments (par défaut ceux du processus).
+    """
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
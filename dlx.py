@@ -0,0 +1,178 @@
+# Résolution par couverture exacte (algorithme X de Knuth avec des liens dansants, DLX).
+# Pour une grille 9x9, les 324 contraintes du Sudoku sont des colonnes : chaque case remplie (81),
+# chaque chiffre dans chaque ligne (81), dans chaque colonne (81) et dans chaque bloc (81). Les 729
+# placements possibles (ligne, colonne, chiffre) sont des rangées couvrant chacune 4 colonnes.
+# Les autres tailles de grille suivent le même schéma (voir units.Layout).
+# Les nœuds sont stockés dans des listes d'entiers (gauche, droite, haut, bas, colonne) :
+# le nœud 0 est la racine, les nœuds suivants les en-têtes de colonne.
+from functools import lru_cache
+
+from units import layout_for
+
+
+def placement_columns(index: int, box: int = 3) -> tuple[int, int, int, int]:
+    """
+    Args:
+        index (int): Numéro du placement, (row * size + col) * size + number - 1, size valant box * box.
+        box (int): Côté d'un bloc de la grille.
+
+    Returns:
+        tuple[int, int, int, int]: Les 4 colonnes (numérotées à partir de 1) couvertes par le placement.
+    """
+    size = box * box
+    cells = size * size
+    cell, digit = divmod(index, size)
+    row, col = divmod(cell, size)
+    block = box * (row // box) + col // box
+    return (1 + cell, 1 + cells + row * size + digit, 1 + 2 * cells + col * size + digit,
+            1 + 3 * cells + block * size + digit)
+
+
+@lru_cache(maxsize=None)
+def build(box: int = 3) -> tuple[list[int], ...]:
+    """
+    Construit la matrice complète des placements d'une grille, une seule fois par taille :
+    elle est ensuite copiée à chaque résolution.
+
+    Args:
+        box (int): Côté d'un bloc de la grille.
+
+    Returns:
+        tuple[list[int], ...]: Les listes gauche, droite, haut, bas, colonne, taille des colonnes,
+        et numéro de placement de chaque nœud. Les nœuds du placement index commencent
+        à 4 * cells + 1 + 4 * index.
+    """
+    columns = 4 * box ** 4
+    left = [columns] + list(range(columns))
+    right = list(range(1, columns + 1)) + [0]
+    up = list(range(columns + 1))
+    down = list(range(columns + 1))
+    column = list(range(columns + 1))
+    size = [0] * (columns + 1)
+    placement = [-1] * (columns + 1)
+    for index in range(box ** 6):
+        first = len(left)
+        for position, col in enumerate(placement_columns(index, box)):
+            node = first + position
+            left.append(first + (position - 1) % 4)
+            right.append(first + (position + 1) % 4)
+            # Ajout en bas de la colonne
+            up.append(up[col])
+            down.append(col)
+            down[up[col]] = node
+            up[col] = node
+            column.append(col)
+            placement.append(index)
+            size[col] += 1
+    return left, right, up, down, column, size, placement
+
+
+def solutions(values: bytes, limit: int = None):
+    """
+    Énumère les solutions d'une grille, sans récursion : la pile des rangées choisies remplace
+    la pile d'appels.
+
+    Args:
+        values (bytes): Les valeurs de la grille (0 pour une case vide), dont le nombre donne la taille.
+        limit (int): Nombre maximal de solutions à énumérer (toutes si None).
+
+    Yields:
+        bytes: Les valeurs de chaque solution.
+    """
+    grid = layout_for(len(values))
+    digits = grid.size
+    first_node = 4 * grid.cells + 1
+    left, right, up, down, column, size, placement = (list(part) for part in build(grid.box))
+
+    def cover(col: int) -> None:
+        left[right[col]] = left[col]
+        right[left[col]] = right[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(col: int) -> None:
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        left[right[col]] = col
+        right[left[col]] = col
+
+    # Les valeurs données couvrent leurs 4 colonnes ; une colonne déjà couverte est une contradiction
+    solution = bytearray(values)
+    covered = set()
+    for cell, value in enumerate(values):
+        if value:
+            node = first_node + 4 * (cell * digits + value - 1)
+            for j in (node, node + 1, node + 2, node + 3):
+                if column[j] in covered:
+                    return
+                covered.add(column[j])
+                cover(column[j])
+
+    found = 0
+    stack = []
+    forward = True
+    while True:
+        if forward:
+            if right[0] == 0:
+                for node in stack:
+                    cell, digit = divmod(placement[node], digits)
+                    solution[cell] = digit + 1
+                yield bytes(solution)
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+                forward = False
+                continue
+            # Colonne ayant le moins de rangées (heuristique MRV)
+            col, best = 0, digits + 1
+            j = right[0]
+            while j:
+                if size[j] < best:
+                    col, best = j, size[j]
+                    if best <= 1:
+                        break
+                j = right[j]
+            if best == 0:
+                forward = False
+                continue
+            cover(col)
+            node = down[col]
+            stack.append(node)
+            j = right[node]
+            while j != node:
+                cover(column[j])
+                j = right[j]
+        else:
+            # Retour en arrière : on essaie la rangée suivante de la dernière colonne choisie
+            if not stack:
+                return
+            node = stack.pop()
+            col = column[node]
+            j = left[node]
+            while j != node:
+                uncover(column[j])
+                j = left[j]
+            node = down[node]
+            if node != col:
+                stack.append(node)
+                j = right[node]
+                while j != node:
+                    cover(column[j])
+                    j = right[j]
+                forward = True
+            else:
+                uncover(col)
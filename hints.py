@@ -0,0 +1,408 @@
+from itertools import combinations
+
+from units import BOX_OF, BOXES, COLS, PEERS, ROWS, UNITS
+
+# Noms des techniques, pour l'affichage des indices
+TECHNIQUE_NAMES = {
+    "error": "Erreur",
+    "naked_single": "Singleton nu",
+    "hidden_single": "Singleton caché",
+    "naked_pair": "Paire nue",
+    "hidden_pair": "Paire cachée",
+    "pointing": "Paire pointante",
+    "box_line": "Réduction bloc/ligne",
+    "naked_triple": "Triplet nu",
+    "hidden_triple": "Triplet caché",
+    "x_wing": "X-Wing",
+    "swordfish": "Swordfish",
+}
+
+
+def digits(mask: int) -> list[int]:
+    """
+    Args:
+        mask (int): Masque de bits (bit n - 1 pour la valeur n).
+
+    Returns:
+        list[int]: Les valeurs présentes dans le masque, dans l'ordre croissant.
+    """
+    return [number for number in range(1, 10) if mask >> (number - 1) & 1]
+
+
+def coordinates(index: int) -> str:
+    """
+    Args:
+        index (int): Indice de la case (row * 9 + col).
+
+    Returns:
+        str: La case sous la forme (ligne, colonne), numérotées à partir de 1.
+    """
+    return f"({index // 9 + 1}, {index % 9 + 1})"
+
+
+# Déduction produite par une technique de résolution
+class Deduction:
+    def __init__(self, technique: str, placements=(), eliminations=(), cells=()):
+        """
+        Initialise une déduction.
+
+        Args:
+            technique (str): Nom de la technique (clé de TECHNIQUE_NAMES).
+            placements: Valeurs à placer, sous forme de couples (indice, valeur).
+            eliminations: Candidats à retirer, sous forme de couples (indice, masque de bits).
+            cells: Indices des cases qui justifient la déduction.
+        """
+        self.technique = technique
+        self.placements = list(placements)
+        self.eliminations = list(eliminations)
+        self.cells = list(cells)
+
+    @property
+    def affected(self) -> list[int]:
+        """
+        Returns:
+            list[int]: Indices des cases modifiées par la déduction.
+        """
+        return [index for index, _ in self.placements] + [index for index, _ in self.eliminations]
+
+    def __str__(self) -> str:
+        """
+        Returns:
+            str: La déduction expliquée en une phrase.
+        """
+        name = TECHNIQUE_NAMES[self.technique]
+        if self.technique == "error":
+            return f"{name} : " + ", ".join(coordinates(index) for index in self.cells) + " ne correspond pas à la solution"
+        if self.placements:
+            return f"{name} : " + ", ".join(f"{value} en {coordinates(index)}" for index, value in self.placements)
+        return f"{name} : on retire " + ", ".join(
+            f"{'/'.join(map(str, digits(mask)))} de {coordinates(index)}" for index, mask in self.eliminations
+        )
+
+
+def find_naked_single(values: bytearray, candidates: list[int]) -> Deduction | None:
+    """
+    Cherche une case vide n'ayant plus qu'une valeur possible.
+
+    Args:
+        values (bytearray): Les 81 valeurs de la grille.
+        candidates (list[int]): Les 81 masques de candidats (nuls pour les cases remplies).
+
+    Returns:
+        Deduction | None: La déduction trouvée, ou None.
+    """
+    for index, mask in enumerate(candidates):
+        if mask and mask & (mask - 1) == 0:
+            return Deduction("naked_single", placements=[(index, mask.bit_length())], cells=[index])
+    return None
+
+
+def find_hidden_single(values: bytearray, candidates: list[int]) -> Deduction | None:
+    """
+    Cherche une valeur qui ne peut aller que dans une seule case d'une unité.
+
+    Args:
+        values (bytearray): Les 81 valeurs de la grille.
+        candidates (list[int]): Les 81 masques de candidats.
+
+    Returns:
+        Deduction | None: La déduction trouvée, ou None.
+    """
+    for unit in UNITS:
+        once, twice = 0, 0
+        for index in unit:
+            twice |= once & candidates[index]
+            once |= candidates[index]
+        singles = once & ~twice
+        if singles:
+            bit = singles & -singles
+            index = next(index for index in unit if candidates[index] & bit)
+            return Deduction("hidden_single", placements=[(index, bit.bit_length())], cells=unit)
+    return None
+
+
+def find_naked_subset(candidates: list[int], size: int, technique: str) -> Deduction | None:
+    """
+    Cherche size cases d'une unité dont les candidats réunis comptent exactement size valeurs :
+    ces valeurs peuvent être retirées des autres cases de l'unité.
+
+    Args:
+        candidates (list[int]): Les 81 masques de candidats.
+        size (int): Taille du sous-ensemble (2 pour une paire, 3 pour un triplet).
+        technique (str): Nom de la technique à renvoyer.
+
+    Returns:
+        Deduction | None: La déduction trouvée, ou None.
+    """
+    for unit in UNITS:
+        empty = [index for index in unit if candidates[index]]
+        small = [index for index in empty if 2 <= candidates[index].bit_count() <= size]
+        for subset in combinations(small, size):
+            union = 0
+            for index in subset:
+                union |= candidates[index]
+            if union.bit_count() != size:
+                continue
+            eliminations = [
+                (index, candidates[index] & union) for index in empty
+                if index not in subset and candidates[index] & union
+            ]
+            if eliminations:
+                return Deduction(technique, eliminations=eliminations, cells=subset)
+    return None
+
+
+def find_hidden_subset(candidates: list[int], size: int, technique: str) -> Deduction | None:
+    """
+    Cherche size valeurs qui n'apparaissent que dans les mêmes size cases d'une unité :
+    les autres candidats de ces cases peuvent être retirés.
+
+    Args:
+        candidates (list[int]): Les 81 masques de candidats.
+        size (int): Taille du sous-ensemble (2 pour une paire, 3 pour un triplet).
+        technique (str): Nom de la technique à renvoyer.
+
+    Returns:
+        Deduction | None: La déduction trouvée, ou None.
+    """
+    for unit in UNITS:
+        positions = {}
+        for number in range(1, 10):
+            bit = 1 << (number - 1)
+            cells = [index for index in unit if candidates[index] & bit]
+            if 2 <= len(cells) <= size:
+                positions[bit] = cells
+        for subset in combinations(positions, size):
+            cells = set()
+            for bit in subset:
+                cells.update(positions[bit])
+            if len(cells) != size:
+                continue
+            mask = sum(subset)
+            eliminations = [(index, candidates[index] & ~mask) for index in sorted(cells) if candidates[index] & ~mask]
+            if eliminations:
+                return Deduction(technique, eliminations=eliminations, cells=sorted(cells))
+    return None
+
+
+def find_pointing(candidates: list[int]) -> Deduction | None:
+    """
+    Cherche une valeur dont toutes les positions dans un bloc sont sur une même ligne ou colonne :
+    elle peut être retirée du reste de cette ligne ou colonne.
+
+    Args:
+        candidates (list[int]): Les 81 masques de candidats.
+
+    Returns:
+        Deduction | None: La déduction trouvée, ou None.
+    """
+    for box in BOXES:
+        for number in range(1, 10):
+            bit = 1 << (number - 1)
+            cells = [index for index in box if candidates[index] & bit]
+            if len(cells) < 2:
+                continue
+            for lines, line_of in ((ROWS, cells[0] // 9), (COLS, cells[0] % 9)):
+                line = lines[line_of]
+                if all(index in line for index in cells):
+                    eliminations = [
+                        (index, bit) for index in line
+                        if index not in box and candidates[index] & bit
+                    ]
+                    if eliminations:
+                        return Deduction("pointing", eliminations=eliminations, cells=cells)
+    return None
+
+
+def find_box_line(candidates: list[int]) -> Deduction | None:
+    """
+    Cherche une valeur dont toutes les positions dans une ligne ou colonne sont dans un même bloc :
+    elle peut être retirée du reste de ce bloc.
+
+    Args:
+        candidates (list[int]): Les 81 masques de candidats.
+
+    Returns:
+        Deduction | None: La déduction trouvée, ou None.
+    """
+    for line in ROWS + COLS:
+        for number in range(1, 10):
+            bit = 1 << (number - 1)
+            cells = [index for index in line if candidates[index] & bit]
+            if len(cells) < 2 or any(BOX_OF[index] != BOX_OF[cells[0]] for index in cells):
+                continue
+            eliminations = [
+                (index, bit) for index in BOXES[BOX_OF[cells[0]]]
+                if index not in line and candidates[index] & bit
+            ]
+            if eliminations:
+                return Deduction("box_line", eliminations=eliminations, cells=cells)
+    return None
+
+
+def find_fish(candidates: list[int], size: int, technique: str) -> Deduction | None:
+    """
+    Cherche un X-Wing (size = 2) ou un Swordfish (size = 3) : si une valeur n'apparaît, dans size
+    lignes, que dans les mêmes size colonnes, elle peut être retirée du reste de ces colonnes
+    (et de même en échangeant lignes et colonnes).
+
+    Args:
+        candidates (list[int]): Les 81 masques de candidats.
+        size (int): Nombre de lignes (ou colonnes) du motif.
+        technique (str): Nom de la technique à renvoyer.
+
+    Returns:
+        Deduction | None: La déduction trouvée, ou None.
+    """
+    for bases, covers, position in ((ROWS, COLS, lambda index: index % 9), (COLS, ROWS, lambda index: index // 9)):
+        for number in range(1, 10):
+            bit = 1 << (number - 1)
+            lines = {}
+            for base, line in enumerate(bases):
+                cells = [index for index in line if candidates[index] & bit]
+                if 2 <= len(cells) <= size:
+                    lines[base] = cells
+            for subset in combinations(lines, size):
+                cover = {position(index) for base in subset for index in lines[base]}
+                if len(cover) != size:
+                    continue
+                pattern = [index for base in subset for index in lines[base]]
+                eliminations = [
+                    (index, bit) for line in cover for index in covers[line]
+                    if index not in pattern and candidates[index] & bit
+                ]
+                if eliminations:
+                    return Deduction(technique, eliminations=eliminations, cells=pattern)
+    return None
+
+
+# Techniques de la plus simple à la plus difficile, avec leur poids de difficulté
+TECHNIQUES = [
+    ("naked_single", 1, find_naked_single),
+    ("hidden_single", 2, find_hidden_single),
+    ("naked_pair", 25, lambda values, candidates: find_naked_subset(candidates, 2, "naked_pair")),
+    ("pointing", 25, lambda values, candidates: find_pointing(candidates)),
+    ("box_line", 25, lambda values, candidates: find_box_line(candidates)),
+    ("hidden_pair", 30, lambda values, candidates: find_hidden_subset(candidates, 2, "hidden_pair")),
+    ("naked_triple", 40, lambda values, candidates: find_naked_subset(candidates, 3, "naked_triple")),
+    ("hidden_triple", 45, lambda values, candidates: find_hidden_subset(candidates, 3, "hidden_triple")),
+    ("x_wing", 60, lambda values, candidates: find_fish(candidates, 2, "x_wing")),
+    ("swordfish", 80, lambda values, candidates: find_fish(candidates, 3, "swordfish")),
+]
+
+
+def next_deduction(values: bytearray, candidates: list[int]) -> Deduction | None:
+    """
+    Applique les techniques dans l'ordre de difficulté et renvoie la première déduction trouvée.
+
+    Args:
+        values (bytearray): Les 81 valeurs de la grille.
+        candidates (list[int]): Les 81 masques de candidats.
+
+    Returns:
+        Deduction | None: La déduction la plus simple, ou None si aucune technique ne s'applique.
+    """
+    for _, _, find in TECHNIQUES:
+        deduction = find(values, candidates)
+        if deduction is not None:
+            return deduction
+    return None
+
+
+def apply_deduction(values: bytearray, candidates: list[int], deduction: Deduction) -> None:
+    """
+    Applique une déduction à des valeurs et des masques de candidats, en retirant la valeur
+    placée des candidats de ses voisins.
+
+    Args:
+        values (bytearray): Les 81 valeurs de la grille, modifiées en place.
+        candidates (list[int]): Les 81 masques de candidats, modifiés en place.
+        deduction (Deduction): La déduction à appliquer.
+    """
+    for index, value in deduction.placements:
+        values[index] = value
+        candidates[index] = 0
+        bit = ~(1 << (value - 1))
+        for peer in PEERS[index]:
+            candidates[peer] &= bit
+    for index, mask in deduction.eliminations:
+        candidates[index] &= ~mask
+
+
+# Moteur d'indices travaillant sur l'état courant d'une grille
+class HintEngine:
+    def __init__(self, grid: "Grid", cache: "SolveCache" = None):
+        """
+        Initialise le moteur et l'abonne aux modifications de la grille.
+
+        Args:
+            grid (Grid): La grille sur laquelle calculer les indices.
+            cache (SolveCache): Cache où chercher la solution d'une grille chargée sans elle (aucun si None).
+        """
+        self.grid = grid
+        self.cache = cache
+        self.eliminated = [0] * 81  # Candidats retirés par les indices déjà donnés
+        grid.add_listener(self.on_grid_change)
+
+    def on_grid_change(self, cells: list[tuple[int, int]] | None) -> None:
+        """
+        Oublie les candidats retirés quand une nouvelle grille est chargée.
+
+        Args:
+            cells (list[tuple[int, int]] | None): Cases modifiées, ou None pour toute la grille.
+        """
+        if cells is None:
+            self.eliminated = [0] * 81
+
+    def pencil_marks(self, col: int, row: int) -> int:
+        """
+        Notes automatiques d'une case : ses candidats, moins ceux retirés par les indices.
+
+        Args:
+            col (int): Colonne de la case.
+            row (int): Ligne de la case.
+
+        Returns:
+            int: Masque de bits des candidats restants.
+        """
+        return self.grid.candidates(col, row) & ~self.eliminated[row * 9 + col]
+
+    def candidates(self) -> list[int]:
+        """
+        Returns:
+            list[int]: Les 81 masques de notes de la grille courante.
+        """
+        return [self.pencil_marks(index % 9, index // 9) for index in range(81)]
+
+    def next_hint(self) -> Deduction | None:
+        """
+        Calcule le prochain indice sur l'état courant de la grille. Si une valeur saisie par le
+        joueur ne correspond pas à la solution (connue, ou trouvée dans le cache), l'indice le signale.
+
+        Returns:
+            Deduction | None: L'indice, ou None si aucune technique ne s'applique.
+        """
+        grid = self.grid
+        solution = grid.solution
+        if solution.count(0) and self.cache is not None:
+            result = self.cache.solve(grid.initial_values)
+            if result.count == 1:
+                solution = result.solution
+        if solution.count(0) == 0:
+            errors = [
+                index for index, value in enumerate(grid.values)
+                if value and not grid.locked >> index & 1 and value != solution[index]
+            ]
+            if errors:
+                return Deduction("error", cells=errors)
+        return next_deduction(grid.values, self.candidates())
+
+    def apply(self, deduction: Deduction) -> None:
+        """
+        Retient les candidats retirés par un indice. Les valeurs à placer sont laissées au joueur.
+
+        Args:
+            deduction (Deduction): L'indice à appliquer.
+        """
+        for index, mask in deduction.eliminations:
+            self.eliminated[index] |= mask
@@ -1,7 +1,10 @@
+import os
+
 from kivy.app import App
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
+from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 from kivy.clock import Clock
@@ -9,12 +12,18 @@ from kivy.uix.screenmanager import ScreenManager, Screen, SlideTransition
 from kivy.animation import Animation
 from kivy.uix.image import AsyncImage
 
-from backend import Grid  # Importation de la classe Grid du backend
+from backend import SYMBOLS, Grid  # Importation de la classe Grid du backend et des symboles des chiffres
+from cache import SOLVE_CACHE  # Résultats de résolution déjà calculés
+from hints import HintEngine  # Notes automatiques et indices par techniques de résolution
+from pool import PuzzlePool  # Réserve de grilles générées en arrière-plan
+from store import PuzzleStore  # Grilles générées conservées sur le disque
 
 APP_COLORS = {
         'blue': [0.38, 0.698, 1, 1],  # Couleur de fond des cellules modifiables
+        'light_blue': [0.55, 0.8, 1, 1],  # Couleur des voisins de la cellule sélectionnée
         'dark_blue': [0.2, 0.4, 0.8, 1],  # Couleur des cellules préremplies
         'navy': [0, 0, 0.5, 1],  # Couleur de la cellule sélectionnée
+        'conflict': [0.9, 0.35, 0.35, 1],  # Couleur des cellules en conflit (valeur en double dans une unité)
         'green': [0.3, 0.8, 0.3, 1],  # Couleur verte
         'red': [0.8, 0.3, 0.3, 1],  # Couleur rouge
         'yellow': [0.8, 0.8, 0.3, 1],  # Couleur jaune
@@ -23,13 +32,23 @@ APP_COLORS = {
         'black': [0, 0, 0, 1]  # Texte noir
     }
 
+# Niveaux : (nombre maximal de cases à vider, fourchette de notes de rating.rate), nom et couleur
 LEVELS = [
-            (35, "Facile", APP_COLORS['green']),
-            (50, "Intermédiaire", APP_COLORS['yellow']),
-            (65, "Difficile", APP_COLORS['red']),
+            ((40, (0, 8)), "Facile", APP_COLORS['green']),
+            ((55, (9, 45)), "Intermédiaire", APP_COLORS['yellow']),
+            ((64, (46, None)), "Difficile", APP_COLORS['red']),
         ]
+# Mode grille géante 16x16 (blocs 4x4) : cases vidées en gardant une solution unique, sans notation
+GIANT_LEVEL = ((150, None), "Grille géante 16x16", APP_COLORS['navy'])
+
+HIGHLIGHT_PEERS = True  # Met en évidence la ligne, la colonne et le bloc de la cellule sélectionnée
 
 GRID_BACKEND = Grid()
+GIANT_BACKEND = Grid(box=4)
+HINT_ENGINE = HintEngine(GRID_BACKEND, SOLVE_CACHE)
+PUZZLE_POOL = PuzzlePool([level for level, _, _ in LEVELS])
+# Une seule grille géante d'avance : sa génération prend de l'ordre d'une seconde
+GIANT_POOL = PuzzlePool([GIANT_LEVEL[0]], size=1, box=4)
 
 class SudokuCell(Button):
     """
@@ -37,7 +56,7 @@ class SudokuCell(Button):
 
     Attributs :
         coordinates (tuple) : Les coordonnées (ligne, colonne) de la cellule dans la grille.
-        parentWidget (SmallGrid) : Référence au parent (petite grille 3x3).
+        parentWidget (SmallGrid) : Référence au parent (petit bloc de la grille).
         font_size (int) : Taille de la police pour afficher les chiffres.
         halign (str) : Alignement horizontal du texte.
         multiline (bool) : Indique si plusieurs lignes sont autorisées (toujours False ici).
@@ -70,73 +89,150 @@ class SudokuCell(Button):
 
     def select_cell(self):
         """
-        Met en évidence la cellule sélectionnée et réinitialise la sélection des autres cellules.
+        Met en évidence la cellule sélectionnée et réinitialise la sélection précédente.
         """
         self.parentWidget.parentWidget.parentWidget.selectedCell = self
-        for smallgrid in self.parentWidget.parentWidget.children:
-            for cell in smallgrid.children:
-                if not cell.disabled:
-                    anim = Animation(background_color=APP_COLORS['blue'], duration=0.2)
-                    anim.start(cell)
-        anim = Animation(background_color=APP_COLORS['navy'], duration=0.2)
-        anim.start(self)
 
 
     def disable_buttons(self):
         """Désactive les boutons non valides pour la cellule sélectionnée."""
         gameScreen:GameScreen = self.parentWidget.parentWidget.parentWidget
         buttons = gameScreen.button_layout.children
+        candidates = gameScreen.backend.candidates(col=self.coordinates[1], row=self.coordinates[0], initial=True)
         for button in buttons:
             button:Button = button
-            if GRID_BACKEND.is_valid(col=self.coordinates[1], row=self.coordinates[0], number=int(button.text), initial=True):
-                button.disabled = False
-            else:
-                button.disabled = True
+            button.disabled = not candidates >> SYMBOLS.index(button.text) & 1
 
 
 
 class SmallGrid(GridLayout):
     """
-    Représente une petite grille 3x3 dans la grande grille Sudoku.
+    Représente une petite grille (un bloc, 3x3 pour une grille 9x9) dans la grande grille Sudoku.
 
     Attributs :
         row (int) : Indice de la ligne de la petite grille dans la grande grille.
         col (int) : Indice de la colonne de la petite grille dans la grande grille.
         parentWidget (BigGrid) : Référence au parent (grande grille).
+        box (int) : Côté du bloc.
     """
 
-    def __init__(self, row, col, parentWidget):
+    def __init__(self, row, col, parentWidget, box=3):
         super().__init__()
         self.parentWidget = parentWidget
-        self.cols = self.rows = 3
+        self.cols = self.rows = box
         self.spacing = [2, 2]
 
-        for rowCel in range(3):
-            for colCel in range(3):
-                cell = SudokuCell(coordinates=(row*3+rowCel, col*3+colCel), parentWidget=self)
+        for rowCel in range(box):
+            for colCel in range(box):
+                cell = SudokuCell(coordinates=(row*box+rowCel, col*box+colCel), parentWidget=self)
                 self.add_widget(cell)
 
 
 class BigGrid(GridLayout):
     """
-    Représente la grande grille Sudoku contenant 9 petites grilles 3x3.
+    Représente la grande grille Sudoku contenant une petite grille par bloc (9 petites grilles 3x3
+    pour une grille 9x9).
 
     Attributs :
         parentWidget (GameScreen) : Référence à l'écran de jeu.
+        backend (Grid) : Grille du backend affichée.
+        font_size (int) : Taille de la police des valeurs, réduite pour les grandes grilles.
+        conflicts (set) : Coordonnées (ligne, colonne) des cellules en conflit, mises en évidence.
     """
 
     def __init__(self, parentWidget):
         super().__init__()
         self.parentWidget = parentWidget
-        self.cols = self.rows = 3
+        self.backend = parentWidget.backend
+        box = self.backend.box
+        self.cols = self.rows = box
         self.spacing = (10, 10)  # Espacement entre les petites grilles
+        self.font_size = 96 // box
+        self.conflicts = set()
 
-        # Création des 9 petites grilles
-        for row in range(3):
-            for col in range(3):
-                small_grid = SmallGrid(row, col, parentWidget=self)
+        # Création des petites grilles
+        for row in range(box):
+            for col in range(box):
+                small_grid = SmallGrid(row, col, parentWidget=self, box=box)
                 self.add_widget(small_grid) # Ajoute la petite grille à la mise en page
 
+        # Accès direct à chaque cellule par ses coordonnées (ligne, colonne)
+        self.cells = {cell.coordinates: cell for small_grid in self.children for cell in small_grid.children}
+        self.backend.add_listener(self.on_backend_change)
+
+    def on_backend_change(self, cells):
+        """
+        Appelée par le backend à chaque modification de la grille.
+
+        Paramètres :
+            cells (list | None) : Cases (colonne, ligne) modifiées, ou None si toute la grille a changé.
+        """
+        # Les conflits sont lus dans les compteurs du backend ; seules les cellules qui entrent
+        # ou sortent d'un conflit sont redessinées en plus des cellules modifiées
+        size = self.backend.size
+        conflicts = {divmod(index, size) for index in self.backend.conflicts()}
+        changed_conflicts = conflicts ^ self.conflicts
+        self.conflicts = conflicts
+        if cells is None:
+            self.set_grid_value()
+            return
+        changed = {(row, col) for col, row in cells} | changed_conflicts
+        if self.parentWidget.show_notes:
+            # Les notes des voisins dépendent de la valeur saisie
+            for col, row in cells:
+                changed.update(divmod(peer, size) for peer in self.backend.layout.peers[row * size + col])
+        for row, col in changed:
+            self.update_cell(row, col)
+
+    def update_cell(self, row, col):
+        """
+        Met à jour une seule cellule en fonction des données du backend.
+
+        Paramètres :
+            row (int) : Ligne de la cellule.
+            col (int) : Colonne de la cellule.
+        """
+        cell = self.cells[(row, col)]
+        box = self.backend.grid[row][col]
+        if box.value == 0:
+            cell.disabled = False
+            if self.parentWidget.show_notes:
+                cell.font_size = 12
+                cell.text = self.pencil_marks(row, col)
+            else:
+                cell.text = ''
+        elif not box.locked:
+            cell.disabled = False
+            cell.font_size = self.font_size
+            cell.text = SYMBOLS[box.value - 1]
+        else:
+            cell.disabled = False
+            cell.font_size = self.font_size
+            cell.text = SYMBOLS[box.value - 1]
+            cell.disabled_color = APP_COLORS['white']
+            cell.disabled = True
+        # Couleur de fond selon le verrouillage et la sélection ; une animation de sélection en cours
+        # viserait la couleur calculée avant ce changement
+        Animation.cancel_all(cell, 'background_color')
+        cell.background_color = self.parentWidget.selection.color_of(row, col)
+
+    def pencil_marks(self, row, col):
+        """
+        Formate les notes automatiques d'une cellule vide sur trois lignes.
+
+        Paramètres :
+            row (int) : Ligne de la cellule.
+            col (int) : Colonne de la cellule.
+
+        Retour :
+            str : Les valeurs encore possibles, chacune à sa place dans un carré 3x3.
+        """
+        marks = self.parentWidget.hints.pencil_marks(col, row)
+        return '\n'.join(
+            ' '.join(str(number) if marks >> (number - 1) & 1 else ' ' for number in range(line, line + 3))
+            for line in (1, 4, 7)
+        )
+
     def set_grid_value(self):
         """
         Met à jour les valeurs de la grande grille en fonction des données du backend.
@@ -145,29 +241,76 @@ class BigGrid(GridLayout):
         - Met à jour les cellules avec les valeurs actuelles.
         - Configure les cellules comme modifiables ou verrouillées selon le backend.
         """
-        grid_values = [box.value for box in GRID_BACKEND.get_81()][::-1]
-        for i, small_grid in enumerate(self.children):
-            values = grid_values[i * 9:(i + 1) * 9]
-
-            for j, value in enumerate(values):
-                cell = small_grid.children[j]
-                row, col = cell.coordinates
-                if GRID_BACKEND.grid[row][col].value == 0:
-                    cell.text = ''
-                    cell.disabled = False
-                    cell.background_color = APP_COLORS['blue']
-                elif not GRID_BACKEND.grid[row][col].locked:
-                    cell.disabled = False
-                    cell.text = str(value)
-                    cell.background_color = APP_COLORS['blue']
-                else:
-                    cell.disabled = False
-                    cell.text = str(value)
-                    cell.background_color = APP_COLORS['dark_blue']
-                    cell.disabled_color = APP_COLORS['white']
-                    cell.disabled = True
-        if self.parent.parent.selectedCell:
-            self.parent.parent.selectedCell.background_color=APP_COLORS['navy']
+        for row, col in self.cells:
+            self.update_cell(row, col)
+
+class SelectionManager:
+    """
+    Gère la cellule sélectionnée de l'écran de jeu. À chaque clic, seules l'ancienne et la nouvelle
+    cellule sont animées ; les voisins dont la mise en évidence change sont recolorés sans animation.
+
+    Attributs :
+        screen (GameScreen) : Écran de jeu contenant la grille.
+        highlight_peers (bool) : Met aussi en évidence la ligne, la colonne et le bloc de la cellule sélectionnée.
+        selected (SudokuCell) : Cellule actuellement sélectionnée (None si aucune).
+        peers (set) : Coordonnées (ligne, colonne) des voisins mis en évidence.
+    """
+
+    def __init__(self, screen, highlight_peers=False):
+        self.screen = screen
+        self.highlight_peers = highlight_peers
+        self.selected = None
+        self.peers = set()
+
+    def color_of(self, row, col):
+        """
+        Calcule la couleur de fond d'une cellule compte tenu de la sélection.
+
+        Paramètres :
+            row (int) : Ligne de la cellule.
+            col (int) : Colonne de la cellule.
+
+        Retour :
+            list : La couleur de fond.
+        """
+        if self.selected is not None and self.selected.coordinates == (row, col):
+            return APP_COLORS['navy']
+        if not self.screen.backend.is_allowed(col, row):
+            return APP_COLORS['dark_blue']
+        if (row, col) in self.screen.grid.conflicts:
+            return APP_COLORS['conflict']
+        if (row, col) in self.peers:
+            return APP_COLORS['light_blue']
+        return APP_COLORS['blue']
+
+    def select(self, cell):
+        """
+        Change la cellule sélectionnée, anime l'ancienne et la nouvelle cellule et recolore directement
+        les voisins dont la mise en évidence change.
+
+        Paramètres :
+            cell (SudokuCell) : Nouvelle cellule sélectionnée (None pour désélectionner).
+        """
+        previous = self.selected
+        changed = self.peers
+        self.selected = cell
+        self.peers = set()
+        if cell is not None and self.highlight_peers:
+            row, col = cell.coordinates
+            size = self.screen.backend.size
+            self.peers = {divmod(peer, size) for peer in self.screen.backend.layout.peers[row * size + col]}
+        animated = {selected.coordinates for selected in (previous, cell) if selected is not None}
+        # Jusqu'à une quarantaine de voisins par clic sur une grille 9x9 : les animer coûterait trop cher
+        for row, col in (changed ^ self.peers) - animated:
+            target = self.screen.grid.cells[(row, col)]
+            Animation.cancel_all(target, 'background_color')
+            target.background_color = self.color_of(row, col)
+
+        for row, col in animated:
+            target = self.screen.grid.cells[(row, col)]
+            Animation.cancel_all(target, 'background_color')
+            Animation(background_color=self.color_of(row, col), duration=0.2).start(target)
+
 
 class GameScreen(Screen):
     """
@@ -177,64 +320,174 @@ class GameScreen(Screen):
         parentWidget (SudokuApp) : Référence à l'application principale.
         name (str) : Nom de l'écran.
         selectedCell (SudokuCell) : Référence à la cellule actuellement sélectionnée.
-        grid (BigGrid) : Grande grille 9x9 affichée dans l'écran.
+        selection (SelectionManager) : Gestionnaire de la sélection et de sa mise en évidence.
+        backend (Grid) : Grille du backend jouée dans l'écran.
+        hints (HintEngine) : Moteur de notes et d'indices (None pour une grille autre que 9x9).
+        grid (BigGrid) : Grande grille affichée dans l'écran.
+        show_notes (bool) : Affiche les notes automatiques dans les cellules vides.
+        hint_label (Label) : Texte du dernier indice donné.
     """
 
-    def __init__(self, parentWidget, name):
+    def __init__(self, parentWidget, name, backend=GRID_BACKEND, hints=HINT_ENGINE):
         """ initialise l'ecran principal"""
         super().__init__()
         self.parentWidget = parentWidget
         self.name = name
-        self.selectedCell = None
+        self.backend = backend
+        self.hints = hints
+        self.selection = SelectionManager(self, highlight_peers=HIGHLIGHT_PEERS)
+        self.show_notes = False
         main_layout = BoxLayout(orientation='vertical') # Mise en page principale verticale
 
-        # Boutons pour sélectionner les chiffres (1 à 9)
-        self.button_layout = GridLayout(cols=9, size_hint=(1, 0.1))
-        for number in range(1, 10):
-            button = Button(text=str(number), font_size=32)
+        # Boutons pour sélectionner les chiffres (1 à 9, puis A à G pour une grille 16x16)
+        self.button_layout = GridLayout(cols=backend.size, size_hint=(1, 0.1))
+        for symbol in SYMBOLS[:backend.size]:
+            button = Button(text=symbol, font_size=288 // backend.size)
             button.bind(on_release=self.clickButton)
             self.button_layout.add_widget(button)
 
-        # Grande grille 9x9
+        # Grande grille (9x9 par défaut)
         self.grid = BigGrid(self)
 
         main_layout.add_widget(self.grid)
         main_layout.add_widget(self.button_layout)
         self.add_widget(main_layout)
 
+        # Indices et notes automatiques, disponibles seulement avec un moteur d'indices
+        self.hint_label = Label(text='', size_hint=(0.6, 1), font_size=18)
+        if hints is not None:
+            self.add_help(main_layout)
+
+        # Annulation, rétablissement et retour à la grille de départ
+        history_layout = BoxLayout(orientation='horizontal', size_hint=(1, 0.1))
+        for text, action in (("Annuler", self.undo), ("Rétablir", self.redo), ("Recommencer", self.restart)):
+            button = Button(text=text, font_size=24)
+            button.on_release = action
+            history_layout.add_widget(button)
+        main_layout.add_widget(history_layout)
+
         back_to_menu_button = Button(text="Retour au Menu", size_hint=(1, 0.1), font_size=32)
         back_to_menu_button.on_release = self.back_to_menu
         main_layout.add_widget(back_to_menu_button)
 
+    def add_help(self, main_layout):
+        """
+        Ajoute les boutons des indices et des notes automatiques.
+
+        Paramètres :
+            main_layout (BoxLayout) : Mise en page principale de l'écran.
+        """
+        help_layout = BoxLayout(orientation='horizontal', size_hint=(1, 0.1))
+        hint_button = Button(text="Indice", size_hint=(0.2, 1), font_size=24)
+        hint_button.on_release = self.show_hint
+        notes_button = ToggleButton(text="Notes", size_hint=(0.2, 1), font_size=24)
+        notes_button.bind(state=self.toggle_notes)
+        help_layout.add_widget(hint_button)
+        help_layout.add_widget(notes_button)
+        help_layout.add_widget(self.hint_label)
+        main_layout.add_widget(help_layout)
+
+    @property
+    def selectedCell(self):
+        """
+        Cellule actuellement sélectionnée (None si aucune).
+        """
+        return self.selection.selected
+
+    @selectedCell.setter
+    def selectedCell(self, cell):
+        self.selection.select(cell)
+
     def start_game(self, lvl):
         """
         Démarre une nouvelle partie avec le niveau de difficulté choisi.
+        Les grilles viennent de la réserve de leur taille, générée en arrière-plan.
 
         Paramètres :
-            lvl (int) : Niveau de difficulté choisi (nombre de cellules vides dans la grille).
+            lvl (tuple) : Niveau de difficulté choisi (nombre maximal de cellules vides, fourchette de notes).
         """
-        GRID_BACKEND.generate(lvl)
         self.selectedCell = None
-        self.grid.set_grid_value()
+        self.hint_label.text = ''
+        # La grille affichée est mise à jour par le backend
+        pool = PUZZLE_POOL if self.backend.box == 3 else GIANT_POOL
+        pool.load(self.backend, lvl)
 
     def clickButton(self, value):
         """
         Gère les clics sur les boutons numériques pour insérer des valeurs dans une cellule.
 
         Paramètres :
-            value (Button) : Bouton numérique cliqué (texte représentant un chiffre entre 1 et 9).
+            value (Button) : Bouton numérique cliqué (texte représentant un chiffre, voir SYMBOLS).
         """
         if self.selectedCell == None:
             return
         coordinates = self.selectedCell.coordinates
 
-        GRID_BACKEND.set_element(coordinates[1], coordinates[0], int(value.text))
-
-        self.grid.set_grid_value()
+        # Seule la cellule modifiée est redessinée, via la notification du backend
+        self.backend.set_element(coordinates[1], coordinates[0], SYMBOLS.index(value.text) + 1)
 
         if self.is_grid_full():
             self.got_resolved()
 
+    def show_hint(self):
+        """
+        Affiche le prochain indice. Un indice qui place une valeur sélectionne la cellule concernée
+        et laisse le joueur saisir la valeur ; un indice qui retire des candidats est appliqué aux notes.
+        """
+        hint = self.hints.next_hint()
+        if hint is None:
+            self.hint_label.text = "Aucun indice disponible"
+            return
+        self.hint_label.text = str(hint)
+        if hint.technique == 'error':
+            row, col = divmod(hint.cells[0], 9)
+        elif hint.placements:
+            row, col = divmod(hint.placements[0][0], 9)
+        else:
+            self.hints.apply(hint)
+            if self.show_notes:
+                for index, _ in hint.eliminations:
+                    self.grid.update_cell(*divmod(index, 9))
+            return
+        cell = self.grid.cells[(row, col)]
+        cell.select_cell()
+        cell.disable_buttons()
+
+    def undo(self):
+        """
+        Annule le dernier coup joué. La cellule concernée est redessinée via la notification du backend.
+        Annuler l'effacement d'une case peut compléter la grille.
+        """
+        if self.backend.undo() and self.is_grid_full():
+            self.got_resolved()
+
+    def redo(self):
+        """
+        Rejoue le dernier coup annulé.
+        """
+        if self.backend.redo() and self.is_grid_full():
+            self.got_resolved()
+
+    def restart(self):
+        """
+        Recommence la grille depuis la grille initiale, sans en générer une nouvelle.
+        """
+        # La désélection vise les couleurs de la grille recommencée
+        self.backend.restart()
+        self.selectedCell = None
+        self.hint_label.text = ''
+
+    def toggle_notes(self, button, state):
+        """
+        Affiche ou masque les notes automatiques.
+
+        Paramètres :
+            button (ToggleButton) : Bouton des notes.
+            state (str) : Nouvel état du bouton ('down' pour afficher les notes).
+        """
+        self.show_notes = state == 'down'
+        self.grid.set_grid_value()
+
     def back_to_menu(self, instance=None):
         """
         Retourne à l'écran du menu principal.
@@ -252,17 +505,13 @@ class GameScreen(Screen):
         Retour :
             bool : True si toutes les cellules sont remplies, sinon False.
         """
-        for row in GRID_BACKEND.grid:
-            for cell in row:
-                if cell.value == 0:
-                    return False
-        return True
+        return self.backend.find_empty_cell() is None
 
     def got_resolved(self):
         """
         Passe à l'écran de victoire si la grille est correctement résolue.
         """
-        if GRID_BACKEND.is_solved():
+        if self.backend.is_solved():
             self.manager.transition = SlideTransition(direction='down')
             self.manager.current = 'win' # change l'ecran actif
 
@@ -315,6 +564,18 @@ class MenuScreen(Screen):
 
         layout.add_widget(button_container)
 
+        # Mode grille géante, joué sur son propre écran
+        level, text, color = GIANT_LEVEL
+        giant_button = Button(
+            text=text,
+            font_size=24,
+            background_color=color,
+            color=APP_COLORS['white'],
+            size_hint=(1, 0.3)
+        )
+        giant_button.bind(on_release=lambda instance: self.select_level(level, screen='giant'))
+        layout.add_widget(giant_button)
+
         # Pied de page
         footer_label = Label(
             text="Amusez-vous bien !",
@@ -343,16 +604,17 @@ class MenuScreen(Screen):
 
         self.add_widget(layout)
 
-    def select_level(self, level):
+    def select_level(self, level, screen='game'):
         """
         Passe à l'écran de jeu et démarre une partie avec le niveau de difficulté choisi.
 
         Paramètres :
-            level (int) : Niveau de difficulté choisi (nombre de cellules vides dans la grille).
+            level (tuple) : Niveau de difficulté choisi (nombre maximal de cellules vides, fourchette de notes).
+            screen (str) : Nom de l'écran de jeu ('giant' pour la grille géante).
         """
-        self.manager.get_screen('game').start_game(level)
+        self.manager.get_screen(screen).start_game(level)
         self.manager.transition = SlideTransition(direction='left')
-        self.manager.current = 'game'
+        self.manager.current = screen
 
     def show_rules(self):
         """
@@ -393,7 +655,8 @@ class RuleScreen(Screen):
             "3. Chaque colonne doit également contenir les chiffres de 1 à 9 sans répétition.\n"
             "4. Chaque sous-grille de 3x3 doit contenir les chiffres de 1 à 9 sans répétition.\n"
             "5. Les chiffres déjà présents dans la grille ne peuvent pas être modifiés.\n"
-            "6. Le jeu est terminé lorsque toutes les cases sont remplies correctement."
+            "6. Le jeu est terminé lorsque toutes les cases sont remplies correctement.\n"
+            "7. La grille géante suit les mêmes règles sur 16x16 cases, avec les chiffres 1 à 9 puis les lettres A à G."
         )
 
         rules_label = Label(
@@ -506,6 +769,52 @@ class WinScreen(Screen):
         App.get_running_app().stop()
 
 
+class LazyScreenManager(ScreenManager):
+    """
+    Gestionnaire d'écrans qui ne construit un écran (et ses images) qu'à la première navigation vers lui.
+
+    Attributs :
+        factories (dict) : Fonctions de construction des écrans pas encore construits, par nom d'écran.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.factories = {}
+
+    def add_factory(self, name, factory):
+        """
+        Déclare un écran qui sera construit à la demande.
+
+        Paramètres :
+            name (str) : Nom de l'écran.
+            factory (callable) : Fonction sans argument qui construit l'écran.
+        """
+        self.factories[name] = factory
+
+    def get_screen(self, name):
+        """
+        Renvoie l'écran demandé, en le construisant s'il ne l'a pas encore été.
+        Appelée par ScreenManager lors de chaque changement d'écran.
+
+        Paramètres :
+            name (str) : Nom de l'écran.
+
+        Retour :
+            Screen : L'écran.
+        """
+        factory = self.factories.pop(name, None)
+        if factory is not None:
+            self.add_widget(factory())
+        return super().get_screen(name)
+
+    def has_screen(self, name):
+        """
+        Retour :
+            bool : True si l'écran existe ou peut être construit.
+        """
+        return name in self.factories or super().has_screen(name)
+
+
 class SudokuApp(App):
     """
     Application principale pour le jeu Sudoku.
@@ -516,14 +825,37 @@ class SudokuApp(App):
     def build(self):
         self.icon = "./Assets/logo.png"
         self.title = 'Sudokube -- Pablo et Ezé'
-        sm = ScreenManager()  # Gestionnaire des écrans
-        sm.add_widget(MenuScreen(name='menu'))  # Ajout de l'écran du menu
-        sm.add_widget(GameScreen(self, name='game'))  # Ajout de l'écran de jeu
-        sm.add_widget(RuleScreen(name='rules'))
-        sm.add_widget(WinScreen(name='win'))
+        sm = LazyScreenManager()  # Gestionnaire des écrans
+        sm.add_widget(MenuScreen(name='menu'))  # Ajout de l'écran du menu, seul construit au démarrage
+        sm.add_factory('game', lambda: GameScreen(self, name='game'))  # Écran de jeu (81 cellules)
+        sm.add_factory('giant', lambda: GameScreen(self, name='giant', backend=GIANT_BACKEND, hints=None))  # 256 cellules
+        sm.add_factory('rules', lambda: RuleScreen(name='rules'))
+        sm.add_factory('win', lambda: WinScreen(name='win'))
         sm.current = 'menu'  # Écran initial défini sur le menu principal
         return sm
 
+    def on_start(self):
+        """
+        Ouvre la réserve de grilles sur le disque et programme la génération des grilles en arrière-plan
+        juste après l'affichage du menu.
+        """
+        PUZZLE_POOL.store = PuzzleStore(os.path.join(self.user_data_dir, 'puzzles'))
+        # La génération ne démarre qu'après l'affichage du menu, pour ne pas le ralentir
+        Clock.schedule_once(lambda dt: PUZZLE_POOL.start(), 1)
+        Clock.schedule_once(lambda dt: GIANT_POOL.start(), 1)
+
+    def on_stop(self):
+        """
+        Arrête la génération des grilles en arrière-plan et ferme la réserve sur le disque
+        à la fermeture de l'application.
+        """
+        PUZZLE_POOL.stop()
+        GIANT_POOL.stop()
+        with PUZZLE_POOL.condition:
+            if PUZZLE_POOL.store is not None:
+                PUZZLE_POOL.store.close()
+                PUZZLE_POOL.store = None
+
 
 if __name__ == "__main__":
     SudokuApp().run()
@@ -0,0 +1,140 @@
+import threading
+from collections import deque
+
+from backend import Grid
+from store import PuzzleStore
+
+SEEDS = 16  # Nombre de grilles d'origine gardées pour chaque niveau
+
+
+# Réserve de grilles pré-générées, remplie en arrière-plan par un thread dédié
+class PuzzlePool:
+    def __init__(self, levels: list[tuple[int, tuple[int, int | None] | None]], size: int = 3, unique: bool = True,
+                 store: PuzzleStore = None, box: int = 3):
+        """
+        Initialise une réserve vide pour chaque niveau de difficulté.
+
+        Args:
+            levels (list[tuple[int, tuple[int, int | None] | None]]): Niveaux de difficulté à préparer,
+                sous forme de couples (nombre de cases à vider, fourchette de notes ou None), transmis à Grid.generate.
+            size (int): Nombre de grilles prêtes à garder pour chaque niveau.
+            unique (bool): Transmis à Grid.generate pour n'obtenir que des grilles à solution unique.
+            store (PuzzleStore): Réserve persistante où ranger les grilles générées, et où en piocher
+                quand la réserve en mémoire est vide (aucune si None).
+            box (int): Côté d'un bloc des grilles générées (voir Grid). Seules les grilles 9x9 sont
+                transformées par Grid.generate_from quand la réserve est vide.
+        """
+        self.size = size
+        self.unique = unique
+        self.box = box
+        self.puzzles = {level: deque() for level in levels}
+        # Dernières grilles générées de chaque niveau, transformées par Grid.generate_from quand la réserve est vide
+        self.seeds = {level: deque(maxlen=SEEDS) for level in levels}
+        self.store = store
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self) -> None:
+        """
+        Démarre le thread de remplissage s'il ne tourne pas déjà.
+        """
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self.run, name="PuzzlePool", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Arrête le thread de remplissage après la génération en cours.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def next_level(self) -> tuple[int, tuple[int, int | None] | None] | None:
+        """
+        Choisit le niveau dont la réserve est la plus vide. À appeler avec le verrou acquis.
+
+        Returns:
+            tuple[int, tuple[int, int | None] | None] | None: Le niveau à compléter, ou None si toutes les réserves sont pleines.
+        """
+        level = min(self.puzzles, key=lambda lvl: len(self.puzzles[lvl]), default=None)
+        if level is None or len(self.puzzles[level]) >= self.size:
+            return None
+        return level
+
+    def run(self) -> None:
+        """
+        Boucle du thread : génère des grilles tant qu'une réserve n'est pas pleine, puis attend
+        qu'une grille soit consommée.
+        """
+        grid = Grid(box=self.box)
+        while True:
+            with self.condition:
+                level = self.next_level()
+                while self.running and level is None:
+                    self.condition.wait()
+                    level = self.next_level()
+                if not self.running:
+                    return
+
+            # La génération se fait hors du verrou pour ne pas bloquer pop
+            grid.generate(level[0], unique=self.unique, band=level[1])
+            with self.condition:
+                if not self.running:
+                    return
+                self.puzzles[level].append((grid.snapshot(), bytes(grid.solution)))
+                if self.box == 3:
+                    self.seeds[level].append((bytes(grid.initial_values), bytes(grid.solution), grid.rating))
+                if self.store is not None:
+                    self.store.add_grid(grid)
+
+    def pop(self, level: tuple[int, tuple[int, int | None] | None]) -> tuple[bytes, bytes] | None:
+        """
+        Retire une grille prête de la réserve et réveille le thread de remplissage.
+
+        Args:
+            level (tuple[int, tuple[int, int | None] | None]): Niveau de difficulté souhaité.
+
+        Returns:
+            tuple[bytes, bytes] | None: L'instantané de la grille (voir Grid.snapshot) et sa solution,
+            ou None si la réserve de ce niveau est vide.
+        """
+        with self.condition:
+            puzzles = self.puzzles.get(level)
+            if not puzzles:
+                return None
+            puzzle = puzzles.popleft()
+            self.condition.notify()
+            return puzzle
+
+    def load(self, grid: Grid, level: tuple[int, tuple[int, int | None] | None]) -> None:
+        """
+        Charge une grille du niveau demandé dans grid, en temps constant si la réserve n'est pas vide.
+        Sinon la grille est tirée de la réserve persistante, ou obtenue en transformant une grille déjà
+        générée de ce niveau, ou à défaut générée directement.
+
+        Args:
+            grid (Grid): La grille à remplir.
+            level (tuple[int, tuple[int, int | None] | None]): Niveau de difficulté souhaité.
+        """
+        puzzle = self.pop(level)
+        if puzzle is None and self.store is not None and level[1] is not None:
+            with self.condition:
+                number = self.store.random(grid.rng, *level[1])
+                if number is not None:
+                    puzzle = self.store.get(number)[:2]
+        if puzzle is None:
+            with self.condition:
+                seeds = list(self.seeds.get(level, ()))
+            if seeds:
+                grid.generate_from(seeds)
+            else:
+                grid.generate(level[0], unique=self.unique, band=level[1])
+            return
+        snapshot, solution = puzzle
+        grid.restore(snapshot)
+        grid.solution[:] = solution
@@ -0,0 +1,163 @@
+from hints import TECHNIQUES, TECHNIQUE_NAMES
+from units import PEERS, UNITS
+
+# Poids des techniques, et poids d'une grille qui ne se résout pas sans faire d'hypothèse
+WEIGHTS = {name: weight for name, weight, _ in TECHNIQUES}
+GUESS_WEIGHT = 100
+# Les vagues de singletons comptent au plus DEPTH_LIMIT points : une grille résolue par les seuls
+# singletons a donc une note d'au plus SINGLES_LIMIT, et toute autre grille une note supérieure
+DEPTH_LIMIT = 18
+SINGLES_LIMIT = WEIGHTS["hidden_single"] + DEPTH_LIMIT
+# Poids de chaque hypothèse du backtracking
+BRANCH_WEIGHT = 5
+
+
+# Résultat de la notation d'une grille
+class Rating:
+    def __init__(self, hardest: str, depth: int, steps: int, branches: int):
+        """
+        Initialise une note.
+
+        Args:
+            hardest (str): Technique la plus difficile nécessaire ('guess' si la logique ne suffit pas).
+            depth (int): Nombre de vagues de singletons (profondeur de propagation).
+            steps (int): Nombre de déductions logiques appliquées.
+            branches (int): Nombre d'hypothèses du solveur une fois la logique épuisée.
+        """
+        self.hardest = hardest
+        self.depth = depth
+        self.steps = steps
+        self.branches = branches
+
+    @property
+    def score(self) -> int:
+        """
+        Returns:
+            int: La note : poids de la technique la plus difficile, plus la profondeur de propagation
+            (plafonnée) et les hypothèses.
+        """
+        weight = GUESS_WEIGHT if self.hardest == "guess" else WEIGHTS[self.hardest]
+        return weight + min(self.depth, DEPTH_LIMIT) + BRANCH_WEIGHT * self.branches
+
+    def __str__(self) -> str:
+        """
+        Returns:
+            str: La note et ce qui la justifie.
+        """
+        hardest = "Hypothèses" if self.hardest == "guess" else TECHNIQUE_NAMES[self.hardest]
+        return f"{self.score} ({hardest}, {self.depth} vagues, {self.steps} déductions, {self.branches} hypothèses)"
+
+
+def singles_wave(values: bytearray, candidates: list[int]) -> tuple[dict[int, int], bool] | None:
+    """
+    Cherche tous les singletons nus et cachés de la grille, qui forment une vague de propagation.
+
+    Args:
+        values (bytearray): Les 81 valeurs de la grille.
+        candidates (list[int]): Les 81 masques de candidats.
+
+    Returns:
+        tuple[dict[int, int], bool] | None: Les valeurs à placer par indice, et True si un singleton caché
+        est nécessaire ; None si deux singletons se contredisent.
+    """
+    placements = {}
+    for index, mask in enumerate(candidates):
+        if mask and mask & (mask - 1) == 0:
+            placements[index] = mask.bit_length()
+    hidden = False
+    for unit in UNITS:
+        once, twice = 0, 0
+        for index in unit:
+            twice |= once & candidates[index]
+            once |= candidates[index]
+        singles = once & ~twice
+        while singles:
+            bit = singles & -singles
+            singles ^= bit
+            index = next(index for index in unit if candidates[index] & bit)
+            if placements.setdefault(index, bit.bit_length()) != bit.bit_length():
+                return None
+            hidden = hidden or candidates[index] != bit
+    return placements, hidden
+
+
+def rate(grid: "Grid", low: int = None, high: int = None) -> Rating | None:
+    """
+    Note la difficulté de la grille en la résolvant par les techniques logiques, des plus simples
+    aux plus difficiles. Avec une fourchette cible, la notation s'arrête dès que la grille en sort :
+    - une simple propagation des singletons (rapide) écarte les grilles trop faciles pour une
+      fourchette au-dessus de SINGLES_LIMIT, et les grilles trop difficiles pour une fourchette en dessous ;
+    - la note ne faisant que croître, la résolution s'arrête dès qu'elle dépasse high.
+    La grille est laissée dans son état d'origine.
+
+    Args:
+        grid (Grid): La grille à noter, supposée à solution unique.
+        low (int): Note minimale acceptée (aucune si None).
+        high (int): Note maximale acceptée (aucune si None).
+
+    Returns:
+        Rating | None: La note, ou None si elle sort de la fourchette ou si la grille est contradictoire.
+    """
+    values = bytearray(grid.values)
+    if low is not None and low > SINGLES_LIMIT or high is not None and high <= SINGLES_LIMIT:
+        trail = []
+        grid.invalidate_candidates()
+        singles_only = grid.propagate(trail) and grid.find_empty_cell() is None
+        for row, col in reversed(trail):
+            grid.set_value(col, row, 0)
+        if singles_only == (low is not None and low > SINGLES_LIMIT):
+            return None
+
+    grid.invalidate_candidates()
+    candidates = [grid.candidates(index % 9, index // 9) for index in range(81)]
+    rating = Rating("naked_single", 0, 0, 0)
+    while values.count(0):
+        wave = singles_wave(values, candidates)
+        if wave is None:
+            return None
+        placements, hidden = wave
+        if placements:
+            rating.depth += 1
+            rating.steps += len(placements)
+            if hidden and rating.hardest == "naked_single":
+                rating.hardest = "hidden_single"
+            for index, value in placements.items():
+                values[index] = value
+                candidates[index] = 0
+                bit = ~(1 << (value - 1))
+                for peer in PEERS[index]:
+                    candidates[peer] &= bit
+            if any(candidates[index] == 0 for index in range(81) if values[index] == 0):
+                return None
+        else:
+            for name, weight, find in TECHNIQUES[2:]:
+                if high is not None and weight > high:
+                    return None
+                deduction = find(values, candidates)
+                if deduction is not None:
+                    break
+            else:
+                rating.hardest = "guess"
+                break
+            rating.steps += 1
+            if weight > WEIGHTS[rating.hardest]:
+                rating.hardest = name
+            for index, mask in deduction.eliminations:
+                candidates[index] &= ~mask
+        if high is not None and rating.score > high:
+            return None
+
+    if rating.hardest == "guess":
+        # Hypothèses du solveur MRV sur la grille de départ
+        saved = bytes(grid.values)
+        grid.branches = 0
+        solved = grid.solve_mrv()
+        rating.branches = grid.branches
+        grid.values[:] = saved
+        grid.constraints.reset(grid.values)
+        grid.invalidate_candidates()
+        if not solved or high is not None and rating.score > high:
+            return None
+    if low is not None and rating.score < low:
+        return None
+    return rating
@@ -0,0 +1,404 @@
+import mmap
+import os
+import struct
+from hashlib import blake2b
+from random import Random
+
+from backend import Grid
+
+# Enregistrement d'une grille : les 81 chiffres de la solution sur 4 bits (41 octets), le masque
+# des cases données sur 81 bits (11 octets, comme Grid.snapshot) et la note de difficulté
+RECORD = struct.Struct("<41s11sH")
+NO_RATING = 0xFFFF
+HEADER = struct.Struct("<4sHH8x")
+RECORDS_MAGIC = b"SDKR"
+INDEX_MAGIC = b"SDKH"
+VERSION = 1
+# Les index par difficulté regroupent les notes par tranches de DIFFICULTY_STEP points
+DIFFICULTY_STEP = 10
+DIFFICULTY_BUCKETS = 64
+
+# Tables de décodage : chiffres des quartets de poids fort et faible, et bits d'un octet du masque
+HIGH_NIBBLES = bytes(byte >> 4 for byte in range(256))
+LOW_NIBBLES = bytes(byte & 0xF for byte in range(256))
+MASK_BYTES = [bytes(0xFF if byte >> bit & 1 else 0 for bit in range(8)) for byte in range(256)]
+
+
+def pack(solution: bytes, locked: int, rating: int | None) -> bytes:
+    """
+    Args:
+        solution (bytes): Les 81 chiffres de la solution.
+        locked (int): Masque de 81 bits des cases données.
+        rating (int | None): Note de difficulté, ou None si elle est inconnue.
+
+    Returns:
+        bytes: L'enregistrement de RECORD.size octets.
+    """
+    cells = bytes(solution) + b"\0"
+    return RECORD.pack(
+        bytes(cells[i] << 4 | cells[i + 1] for i in range(0, 82, 2)),
+        locked.to_bytes(11, "little"),
+        NO_RATING if rating is None else min(rating, NO_RATING - 1),
+    )
+
+
+def unpack(record: bytes) -> tuple[bytes, bytes, int | None]:
+    """
+    Décode un enregistrement sans boucle Python sur les cases.
+
+    Args:
+        record (bytes): Un enregistrement de RECORD.size octets.
+
+    Returns:
+        tuple[bytes, bytes, int | None]: L'instantané de la grille (voir Grid.snapshot), sa solution
+        et sa note (None si inconnue).
+    """
+    cells, mask, rating = RECORD.unpack(record)
+    solution = bytearray(82)
+    solution[0::2] = cells.translate(HIGH_NIBBLES)
+    solution[1::2] = cells.translate(LOW_NIBBLES)
+    solution = bytes(solution[:81])
+    given = b"".join(MASK_BYTES[byte] for byte in mask)[:81]
+    values = (int.from_bytes(solution, "big") & int.from_bytes(given, "big")).to_bytes(81, "big")
+    return values + mask, solution, None if rating == NO_RATING else rating
+
+
+def content_hash(values: bytes) -> int:
+    """
+    Args:
+        values (bytes): Les 81 valeurs données de la grille.
+
+    Returns:
+        int: Empreinte de 64 bits non nulle de la grille.
+    """
+    return int.from_bytes(blake2b(bytes(values), digest_size=8).digest(), "little") or 1
+
+
+# Table de hachage à adressage ouvert stockée dans un fichier projeté en mémoire :
+# une recherche ne lit que quelques cases, quel que soit le nombre de grilles
+class HashIndex:
+    SLOT = struct.Struct("<QI")
+
+    def __init__(self, path: str, capacity: int = 1 << 12):
+        """
+        Ouvre l'index, ou le crée vide.
+
+        Args:
+            path (str): Chemin du fichier.
+            capacity (int): Nombre de cases d'un nouvel index (une puissance de deux).
+        """
+        self.path = path
+        if not os.path.exists(path):
+            self.create(path, capacity)
+        self.open()
+
+    @classmethod
+    def create(cls, path: str, capacity: int) -> None:
+        """
+        Crée un fichier d'index vide.
+
+        Args:
+            path (str): Chemin du fichier.
+            capacity (int): Nombre de cases (une puissance de deux).
+        """
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(INDEX_MAGIC, VERSION, 0) + struct.pack("<QQ", capacity, 0))
+            file.truncate(HEADER.size + 16 + capacity * cls.SLOT.size)
+
+    def open(self) -> None:
+        """
+        Projette le fichier en mémoire et lit sa capacité et son nombre d'entrées.
+        """
+        self.file = open(self.path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, version, _ = HEADER.unpack_from(self.map)
+        if magic != INDEX_MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} n'est pas un index de grilles")
+        self.capacity, self.count = struct.unpack_from("<QQ", self.map, HEADER.size)
+
+    def close(self) -> None:
+        """
+        Ferme le fichier.
+        """
+        self.map.close()
+        self.file.close()
+
+    def slot_offset(self, slot: int) -> int:
+        """
+        Args:
+            slot (int): Numéro de la case.
+
+        Returns:
+            int: Position de la case dans le fichier.
+        """
+        return HEADER.size + 16 + slot * self.SLOT.size
+
+    def lookup(self, key: int):
+        """
+        Args:
+            key (int): Empreinte recherchée.
+
+        Yields:
+            int: Les numéros d'enregistrement associés à cette empreinte.
+        """
+        mask = self.capacity - 1
+        slot = key & mask
+        while True:
+            stored, number = self.SLOT.unpack_from(self.map, self.slot_offset(slot))
+            if stored == 0:
+                return
+            if stored == key:
+                yield number
+            slot = (slot + 1) & mask
+
+    def insert(self, key: int, number: int) -> None:
+        """
+        Ajoute une entrée, en doublant la table si elle est à moitié pleine.
+
+        Args:
+            key (int): Empreinte non nulle.
+            number (int): Numéro d'enregistrement.
+        """
+        if 2 * (self.count + 1) > self.capacity:
+            self.grow()
+        mask = self.capacity - 1
+        slot = key & mask
+        while self.SLOT.unpack_from(self.map, self.slot_offset(slot))[0]:
+            slot = (slot + 1) & mask
+        self.SLOT.pack_into(self.map, self.slot_offset(slot), key, number)
+        self.count += 1
+        struct.pack_into("<Q", self.map, HEADER.size + 8, self.count)
+
+    def grow(self) -> None:
+        """
+        Recopie les entrées dans une table deux fois plus grande, qui remplace l'ancienne.
+        """
+        temporary = self.path + ".tmp"
+        self.create(temporary, 2 * self.capacity)
+        bigger = HashIndex(temporary)
+        for slot in range(self.capacity):
+            key, number = self.SLOT.unpack_from(self.map, self.slot_offset(slot))
+            if key:
+                bigger.insert(key, number)
+        bigger.map.flush()
+        bigger.close()
+        self.close()
+        os.replace(temporary, self.path)
+        self.open()
+
+
+# Réserve persistante de grilles : un fichier d'enregistrements de taille fixe, un index par
+# empreinte du contenu et un index par tranche de difficulté
+class PuzzleStore:
+    def __init__(self, path: str):
+        """
+        Ouvre la réserve, ou la crée vide.
+
+        Args:
+            path (str): Dossier de la réserve.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        records = os.path.join(path, "puzzles.bin")
+        if not os.path.exists(records):
+            with open(records, "wb") as file:
+                file.write(HEADER.pack(RECORDS_MAGIC, VERSION, RECORD.size))
+        self.file = open(records, "r+b")
+        magic, version, size = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != RECORDS_MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(f"{records} n'est pas une réserve de grilles")
+        self.count = (os.fstat(self.file.fileno()).st_size - HEADER.size) // RECORD.size
+        self.map = None
+        self.mapped = 0
+        self.hashes = HashIndex(os.path.join(path, "hashes.idx"))
+        self.difficulties = [os.path.join(path, f"difficulty-{bucket}.idx") for bucket in range(DIFFICULTY_BUCKETS)]
+        self.unrated = os.path.join(path, "difficulty-none.idx")
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: Nombre de grilles de la réserve.
+        """
+        return self.count
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Ferme les fichiers de la réserve.
+        """
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+        self.hashes.close()
+
+    def record(self, number: int) -> bytes:
+        """
+        Lit un enregistrement dans la projection en mémoire du fichier, étendue si des grilles
+        ont été ajoutées depuis.
+
+        Args:
+            number (int): Numéro de l'enregistrement.
+
+        Returns:
+            bytes: L'enregistrement brut.
+        """
+        if not 0 <= number < self.count:
+            raise IndexError(number)
+        if number >= self.mapped:
+            if self.map is not None:
+                self.map.close()
+            self.file.flush()
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mapped = self.count
+        offset = HEADER.size + number * RECORD.size
+        return self.map[offset:offset + RECORD.size]
+
+    def get(self, number: int) -> tuple[bytes, bytes, int | None]:
+        """
+        Args:
+            number (int): Numéro de la grille.
+
+        Returns:
+            tuple[bytes, bytes, int | None]: L'instantané de la grille (voir Grid.snapshot), sa solution
+            et sa note (None si inconnue).
+        """
+        return unpack(self.record(number))
+
+    def find(self, values: bytes) -> int | None:
+        """
+        Cherche une grille par son contenu, sans parcourir la réserve.
+
+        Args:
+            values (bytes): Les 81 valeurs données de la grille.
+
+        Returns:
+            int | None: Le numéro de la grille, ou None si elle n'est pas dans la réserve.
+        """
+        values = bytes(values)
+        for number in self.hashes.lookup(content_hash(values)):
+            if self.get(number)[0][:81] == values:
+                return number
+        return None
+
+    def add(self, values: bytes, solution: bytes, rating: int = None) -> int | None:
+        """
+        Ajoute une grille si elle n'est pas déjà dans la réserve.
+
+        Args:
+            values (bytes): Les 81 valeurs données de la grille.
+            solution (bytes): Les 81 chiffres de sa solution.
+            rating (int): Sa note de difficulté (voir rating.rate), ou None.
+
+        Returns:
+            int | None: Le numéro de la nouvelle grille, ou None si elle était déjà présente.
+        """
+        if self.find(values) is not None:
+            return None
+        locked = 0
+        for index, value in enumerate(values):
+            if value:
+                locked |= 1 << index
+        number = self.count
+        self.file.seek(0, os.SEEK_END)
+        self.file.write(pack(solution, locked, rating))
+        self.count += 1
+        self.hashes.insert(content_hash(values), number)
+        with open(self.difficulty_index(rating), "ab") as file:
+            file.write(struct.pack("<I", number))
+        return number
+
+    def add_grid(self, grid: Grid) -> int | None:
+        """
+        Ajoute la grille initiale et la solution d'une grille générée.
+
+        Args:
+            grid (Grid): La grille à ajouter.
+
+        Returns:
+            int | None: Le numéro de la nouvelle grille, ou None si elle était déjà présente.
+        """
+        rating = grid.rating.score if grid.rating is not None else None
+        return self.add(grid.initial_values, grid.solution, rating)
+
+    def difficulty_index(self, rating: int | None) -> str:
+        """
+        Args:
+            rating (int | None): Une note, ou None.
+
+        Returns:
+            str: Chemin de l'index contenant les grilles de cette note.
+        """
+        if rating is None:
+            return self.unrated
+        return self.difficulties[min(rating // DIFFICULTY_STEP, DIFFICULTY_BUCKETS - 1)]
+
+    def by_difficulty(self, low: int = 0, high: int = None):
+        """
+        Args:
+            low (int): Note minimale.
+            high (int): Note maximale (aucune si None).
+
+        Yields:
+            int: Les numéros des grilles dont la note est dans la fourchette.
+        """
+        last = DIFFICULTY_BUCKETS - 1 if high is None else min(high // DIFFICULTY_STEP, DIFFICULTY_BUCKETS - 1)
+        for path in self.difficulties[low // DIFFICULTY_STEP:last + 1]:
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as file:
+                for (number,) in struct.iter_unpack("<I", file.read()):
+                    rating = self.get(number)[2]
+                    if low <= rating and (high is None or rating <= high):
+                        yield number
+
+    def random(self, rng: Random, low: int = 0, high: int = None, attempts: int = 32) -> int | None:
+        """
+        Tire une grille au hasard dans une fourchette de notes, en ne lisant que quelques entrées
+        des index par difficulté.
+
+        Args:
+            rng (Random): Générateur aléatoire.
+            low (int): Note minimale.
+            high (int): Note maximale (aucune si None).
+            attempts (int): Nombre de tirages avant d'abandonner.
+
+        Returns:
+            int | None: Le numéro d'une grille de la fourchette, ou None si aucune n'a été trouvée.
+        """
+        last = DIFFICULTY_BUCKETS - 1 if high is None else min(high // DIFFICULTY_STEP, DIFFICULTY_BUCKETS - 1)
+        sizes = [
+            (path, os.path.getsize(path) // 4)
+            for path in self.difficulties[low // DIFFICULTY_STEP:last + 1] if os.path.exists(path)
+        ]
+        total = sum(size for _, size in sizes)
+        for _ in range(attempts if total else 0):
+            position = rng.randrange(total)
+            for path, size in sizes:
+                if position < size:
+                    break
+                position -= size
+            with open(path, "rb") as file:
+                file.seek(4 * position)
+                (number,) = struct.unpack("<I", file.read(4))
+            rating = self.get(number)[2]
+            if low <= rating and (high is None or rating <= high):
+                return number
+        return None
+
+    def load(self, grid: Grid, number: int) -> None:
+        """
+        Charge une grille de la réserve.
+
+        Args:
+            grid (Grid): La grille à remplir.
+            number (int): Numéro de la grille.
+        """
+        snapshot, solution, _ = self.get(number)
+        grid.restore(snapshot)
+        grid.solution[:] = solution
@@ -0,0 +1,312 @@
+from hashlib import blake2b
+from itertools import permutations, product
+from operator import itemgetter
+from random import Random
+
+# Ordres possibles des 3 lignes d'une bande (ou des 3 colonnes d'une pile)
+ORDERS = tuple(permutations(range(3)))
+
+# Nombre de transformations partielles à partir duquel les équivalentes sont fusionnées (voir state_key)
+MERGE_THRESHOLD = 64
+
+
+# Transformation d'une grille qui conserve les règles du Sudoku : transposition, permutation des
+# bandes et des piles, des lignes d'une bande et des colonnes d'une pile, et renumérotation des chiffres
+class Transform:
+    def __init__(self, cells: tuple[int, ...], digits: bytes):
+        """
+        Initialise une transformation.
+
+        Args:
+            cells (tuple[int, ...]): Pour chaque case de la grille transformée, l'indice de la case d'origine.
+            digits (bytes): Les 10 chiffres de la grille transformée correspondant aux chiffres 0 à 9
+                (digits[0] vaut toujours 0).
+        """
+        self.cells = cells
+        self.digits = bytes(digits)
+        self.table = bytes.maketrans(bytes(range(10)), self.digits)
+
+    @classmethod
+    def build(cls, transpose: bool, rows: list[int], cols: list[int], digits: bytes) -> "Transform":
+        """
+        Args:
+            transpose (bool): Transposer la grille avant de permuter les lignes et les colonnes.
+            rows (list[int]): Pour chaque ligne de la grille transformée, la ligne d'origine (après transposition).
+            cols (list[int]): Pour chaque colonne de la grille transformée, la colonne d'origine (après transposition).
+            digits (bytes): Renumérotation des chiffres (voir __init__).
+
+        Returns:
+            Transform: La transformation.
+        """
+        if transpose:
+            cells = tuple(col * 9 + row for row in rows for col in cols)
+        else:
+            cells = tuple(row * 9 + col for row in rows for col in cols)
+        return cls(cells, digits)
+
+    @classmethod
+    def random(cls, rng: Random) -> "Transform":
+        """
+        Tire une transformation au hasard parmi les 2 * 6^8 * 9! possibles.
+
+        Args:
+            rng (Random): Générateur aléatoire.
+
+        Returns:
+            Transform: La transformation.
+        """
+        rows = [3 * band + row for band in rng.sample(range(3), 3) for row in rng.sample(range(3), 3)]
+        cols = [3 * stack + col for stack in rng.sample(range(3), 3) for col in rng.sample(range(3), 3)]
+        return cls.build(rng.random() < 0.5, rows, cols, bytes([0] + rng.sample(range(1, 10), 9)))
+
+    def apply(self, values: bytes) -> bytes:
+        """
+        Args:
+            values (bytes): Les 81 valeurs d'une grille.
+
+        Returns:
+            bytes: Les 81 valeurs de la grille transformée.
+        """
+        return bytes(values[index] for index in self.cells).translate(self.table)
+
+    def inverse(self) -> "Transform":
+        """
+        Returns:
+            Transform: La transformation qui ramène une grille transformée à son origine.
+        """
+        cells = [0] * 81
+        for index, source in enumerate(self.cells):
+            cells[source] = index
+        digits = bytearray(10)
+        for digit, image in enumerate(self.digits):
+            digits[image] = digit
+        return Transform(tuple(cells), digits)
+
+
+def best_column_orders(row: bytes, columns: list[bytes] = None):
+    """
+    Ordres des colonnes qui placent le plus de cases vides en tête de la ligne : les piles les plus
+    vides d'abord, et dans chaque pile les cases vides d'abord. Renuméroter les chiffres dans
+    l'ordre d'apparition donne alors la plus petite première ligne possible.
+
+    Args:
+        row (bytes): Les 9 valeurs de la ligne.
+        columns (list[bytes]): Les 9 colonnes de la grille. Si elles sont données, deux ordres qui ne
+            diffèrent que par l'échange de colonnes identiques (par exemple vides) donnent la même
+            grille, et un seul des deux est produit.
+
+    Yields:
+        tuple[int, ...]: Les ordres des 9 colonnes qui donnent cette plus petite ligne.
+    """
+    empty = [sum(1 for col in range(3 * stack, 3 * stack + 3) if row[col] == 0) for stack in range(3)]
+    stack_orders = [order for order in ORDERS if empty[order[0]] >= empty[order[1]] >= empty[order[2]]]
+    col_orders = []
+    for stack in range(3):
+        cols = range(3 * stack, 3 * stack + 3)
+        col_orders.append([
+            zeros + filled
+            for zeros in permutations([col for col in cols if row[col] == 0])
+            for filled in permutations([col for col in cols if row[col] != 0])
+        ])
+    seen = set() if columns is not None and len(set(columns)) < 9 else None
+    for stacks in stack_orders:
+        for parts in product(*(col_orders[stack] for stack in stacks)):
+            order = parts[0] + parts[1] + parts[2]
+            if seen is not None:
+                image = tuple(columns[col] for col in order)
+                if image in seen:
+                    continue
+                seen.add(image)
+            yield order
+
+
+def relabel(row: bytes, cols: tuple[int, ...], mapping: bytearray, label: int) -> tuple[bytes, bytearray, int]:
+    """
+    Réordonne une ligne et renumérote ses chiffres dans l'ordre d'apparition.
+
+    Args:
+        row (bytes): Les 9 valeurs de la ligne.
+        cols (tuple[int, ...]): Ordre des colonnes.
+        mapping (bytearray): Numéros déjà attribués (0 si le chiffre n'est pas encore apparu).
+        label (int): Prochain numéro à attribuer.
+
+    Returns:
+        tuple[bytes, bytearray, int]: La ligne renumérotée, et les numéros attribués mis à jour.
+    """
+    mapping = mapping[:]
+    out = bytearray(9)
+    for position, col in enumerate(cols):
+        value = row[col]
+        if value:
+            if not mapping[value]:
+                mapping[value] = label
+                label += 1
+            out[position] = mapping[value]
+    return bytes(out), mapping, label
+
+
+def state_key(rows: list[bytes], order: list[int], cols: tuple[int, ...], mapping: bytearray, label: int) -> tuple:
+    """
+    Résume ce qui reste à placer après une transformation partielle : les lignes restantes, telles
+    qu'elles apparaîtront une fois leurs colonnes réordonnées et leurs chiffres renumérotés, groupées
+    par bande. Deux transformations partielles de même clé donnent les mêmes lignes suivantes, il
+    suffit donc d'en prolonger une.
+
+    Args:
+        rows (list[bytes]): Les 9 lignes de la grille (après transposition).
+        order (list[int]): Les lignes déjà placées, dans l'ordre.
+        cols (tuple[int, ...]): Ordre des colonnes.
+        mapping (bytearray): Numéros déjà attribués (voir relabel).
+        label (int): Prochain numéro à attribuer.
+
+    Returns:
+        tuple: La clé de la transformation partielle.
+    """
+    # Les chiffres pas encore renumérotés gardent leur valeur, décalée pour ne pas se confondre avec un numéro
+    digits = bytearray(256)
+    for digit in range(1, 10):
+        digits[digit] = mapping[digit] or 16 + digit
+    pick = itemgetter(*cols)
+
+    def image(row: int) -> bytes:
+        return bytes(pick(rows[row])).translate(digits)
+
+    used = set(order)
+    current = ()
+    if len(order) % 3:
+        band = order[-1] // 3
+        current = tuple(sorted(image(row) for row in range(3 * band, 3 * band + 3) if row not in used))
+    free = tuple(sorted(
+        tuple(sorted(image(row) for row in range(3 * band, 3 * band + 3)))
+        for band in range(3) if all(row // 3 != band for row in used)
+    ))
+    return label, current, free
+
+
+def canonical_transform(values: bytes) -> Transform:
+    """
+    Cherche la transformation qui donne la plus petite grille équivalente (les cases vides comptant
+    comme 0), ligne par ligne : à chaque étape, seules les transformations partielles qui donnent
+    la plus petite ligne sont prolongées. Quand elles sont nombreuses, une seule par clé est gardée
+    (voir state_key), ce qui évite de prolonger les très nombreuses transformations équivalentes
+    d'une grille presque vide.
+
+    Args:
+        values (bytes): Les 81 valeurs de la grille.
+
+    Returns:
+        Transform: Une transformation vers la forme canonique de la grille.
+    """
+    states = []
+    best = None
+    for transpose in (False, True):
+        if transpose:
+            rows = [bytes(values[col * 9 + row] for col in range(9)) for row in range(9)]
+        else:
+            rows = [bytes(values[row * 9:row * 9 + 9]) for row in range(9)]
+        columns = [bytes(row[col] for row in rows) for col in range(9)]
+        # Deux lignes identiques d'une même bande sont interchangeables : une seule est essayée
+        for first in {(row // 3, rows[row]): row for row in range(9)}.values():
+            for cols in best_column_orders(rows[first], columns):
+                line, mapping, label = relabel(rows[first], cols, bytearray(10), 1)
+                if best is None or line < best:
+                    best, states = line, []
+                if line == best:
+                    states.append((transpose, rows, [first], cols, mapping, label))
+
+    for position in range(1, 9):
+        best, survivors = None, []
+        for transpose, rows, order, cols, mapping, label in states:
+            if position % 3 == 0:
+                used = {row // 3 for row in order}
+                choices = [row for row in range(9) if row // 3 not in used]
+            else:
+                band = order[-1] // 3
+                choices = [row for row in range(3 * band, 3 * band + 3) if row not in order]
+            for row in {(row // 3, rows[row]): row for row in choices}.values():
+                line, new_mapping, new_label = relabel(rows[row], cols, mapping, label)
+                if best is None or line < best:
+                    best, survivors = line, []
+                if line == best:
+                    survivors.append((transpose, rows, order + [row], cols, new_mapping, new_label))
+        if len(survivors) > MERGE_THRESHOLD:
+            merged = {}
+            for state in survivors:
+                merged.setdefault(state_key(*state[1:]), state)
+            survivors = list(merged.values())
+        states = survivors
+
+    transpose, _, order, cols, mapping, label = states[0]
+    # Les chiffres absents de la grille reçoivent les numéros restants, dans l'ordre
+    for digit in range(1, 10):
+        if not mapping[digit]:
+            mapping[digit] = label
+            label += 1
+    return Transform.build(transpose, order, list(cols), mapping)
+
+
+def canonical_form(values: bytes) -> bytes:
+    """
+    Forme canonique d'une grille : deux grilles qui ne diffèrent que par une transformation
+    (voir Transform) ont la même forme canonique.
+
+    Args:
+        values (bytes): Les 81 valeurs de la grille.
+
+    Returns:
+        bytes: Les 81 valeurs de la plus petite grille équivalente.
+    """
+    return canonical_transform(values).apply(values)
+
+
+def canonical_key(values: bytes) -> int:
+    """
+    Args:
+        values (bytes): Les 81 valeurs de la grille.
+
+    Returns:
+        int: Empreinte de 64 bits de la forme canonique de la grille.
+    """
+    return int.from_bytes(blake2b(canonical_form(values), digest_size=8).digest(), "little")
+
+
+# Ensemble de grilles à une transformation près, qui ne garde que l'empreinte de chaque forme canonique
+class CanonicalSet:
+    def __init__(self):
+        """
+        Initialise un ensemble vide.
+        """
+        self.keys = set()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, values: bytes) -> bool:
+        return canonical_key(values) in self.keys
+
+    def add(self, values: bytes) -> bool:
+        """
+        Ajoute une grille.
+
+        Args:
+            values (bytes): Les 81 valeurs de la grille.
+
+        Returns:
+            bool: True si aucune grille équivalente n'était dans l'ensemble.
+        """
+        return self.add_key(canonical_key(values))
+
+    def add_key(self, key: int) -> bool:
+        """
+        Ajoute une empreinte déjà calculée par canonical_key (par exemple dans un autre processus).
+
+        Args:
+            key (int): L'empreinte.
+
+        Returns:
+            bool: True si l'empreinte n'était pas dans l'ensemble.
+        """
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
@@ -0,0 +1,84 @@
+from functools import lru_cache
+
+# Tables d'indices précalculées d'une grille de côté size = box * box (9 pour une grille 9x9 à blocs 3x3).
+# Une case est repérée par son indice row * size + col.
+class Layout:
+    def __init__(self, box: int):
+        """
+        Calcule les tables d'une grille à blocs box x box.
+
+        Args:
+            box (int): Côté d'un bloc (2 à 5 : grilles 4x4, 9x9, 16x16 et 25x25).
+        """
+        size = box * box
+        self.box = box
+        self.size = size
+        self.cells = size * size
+        self.full = (1 << size) - 1  # Masque de tous les chiffres (bit n - 1 pour le chiffre n)
+
+        # Les lignes, les colonnes et les blocs, puis toutes les unités dans cet ordre
+        self.rows = tuple(tuple(row * size + col for col in range(size)) for row in range(size))
+        self.cols = tuple(tuple(row * size + col for row in range(size)) for col in range(size))
+        self.boxes = tuple(
+            tuple((box * (b // box) + i) * size + box * (b % box) + j for i in range(box) for j in range(box))
+            for b in range(size)
+        )
+        self.units = self.rows + self.cols + self.boxes
+        # Les mêmes unités sous forme de (row, col, index)
+        self.unit_cells = tuple(tuple((index // size, index % size, index) for index in unit) for unit in self.units)
+
+        # Indices des cases bloc par bloc, de gauche à droite et de haut en bas dans chaque bloc
+        self.box_order = sum(self.boxes, ())
+
+        # Bloc contenant chaque case
+        self.box_of = tuple(box * (index // (size * box)) + index % size // box for index in range(self.cells))
+
+        # Voisins de chaque case : les autres cases de sa ligne, de sa colonne et de son bloc
+        self.peers = tuple(
+            tuple(sorted(
+                set(self.rows[index // size] + self.cols[index % size] + self.boxes[self.box_of[index]]) - {index}
+            ))
+            for index in range(self.cells)
+        )
+
+
+@lru_cache(maxsize=None)
+def layout(box: int) -> Layout:
+    """
+    Args:
+        box (int): Côté d'un bloc.
+
+    Returns:
+        Layout: Les tables de la grille, calculées au premier appel.
+
+    Raises:
+        ValueError: Si la taille n'est pas prise en charge.
+    """
+    if not 2 <= box <= 5:
+        raise ValueError(f"Taille de bloc non prise en charge : {box}")
+    return Layout(box)
+
+
+def layout_for(cells: int) -> Layout:
+    """
+    Args:
+        cells (int): Nombre de cases de la grille (16, 81, 256 ou 625).
+
+    Returns:
+        Layout: Les tables de la grille.
+
+    Raises:
+        ValueError: Si aucune grille n'a ce nombre de cases.
+    """
+    box = round(cells ** 0.25)
+    if box ** 4 != cells:
+        raise ValueError(f"Nombre de cases invalide : {cells}")
+    return layout(box)
+
+
+# Tables de la grille 9x9 standard
+STANDARD = layout(3)
+ROWS, COLS, BOXES, UNITS = STANDARD.rows, STANDARD.cols, STANDARD.boxes, STANDARD.units
+BOX_OF = STANDARD.box_of
+BOX_ORDER = STANDARD.box_order
+PEERS = STANDARD.peers